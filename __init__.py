@@ -185,6 +185,26 @@ def register():
                                         description="(DEBUG) Draw Debug Info For Text",
                                         default=False)
 
+    Scene.measureit_arch_sdf_text = BoolProperty(name="SDF Text",
+                                        description="(EXPERIMENTAL) Draw text from a signed distance field glyph atlas, stays sharp at any zoom and render size",
+                                        default=False)
+
+    Scene.measureit_arch_lod = BoolProperty(name="Level of Detail",
+                                        description="Simplify items that are only a few pixels across in the viewport",
+                                        default=True)
+
+    Scene.measureit_arch_lod_text = IntProperty(name="Hide Text Below",
+                                        description="Items smaller than this many pixels are drawn without text",
+                                        default=40, min=0, subtype='PIXEL')
+
+    Scene.measureit_arch_lod_caps = IntProperty(name="Hide Endcaps Below",
+                                        description="Items smaller than this many pixels are drawn without endcaps",
+                                        default=16, min=0, subtype='PIXEL')
+
+    Scene.measureit_arch_lod_hide = IntProperty(name="Hide Items Below",
+                                        description="Items smaller than this many pixels are skipped, annotations are drawn as a dot",
+                                        default=4, min=0, subtype='PIXEL')
+
     Scene.viewPlane= EnumProperty(
                     items=(('99', "None", "No View Plane Selected",'EMPTY_AXIS',0),
                            ('XY', "XY Plane", "Optimize Dimension for XY Plane (Plan)",'AXIS_TOP',1),
@@ -553,6 +573,11 @@ def unregister():
     del Scene.measureit_arch_debug_vert_loc_toggle
     del Scene.measureit_arch_font_rotation
     del Scene.measureit_arch_font_align
+    del Scene.measureit_arch_sdf_text
+    del Scene.measureit_arch_lod
+    del Scene.measureit_arch_lod_text
+    del Scene.measureit_arch_lod_caps
+    del Scene.measureit_arch_lod_hide
 
     # remove OpenGL data
     measureit_arch_main.ShowHideViewportButton.handle_remove(measureit_arch_main.ShowHideViewportButton, bpy.context)
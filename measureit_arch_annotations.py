@@ -43,6 +43,8 @@ from bpy.props import (
 from .measureit_arch_baseclass import BaseProp, BaseWithText
 from .measureit_arch_main import get_smart_selected, get_selected_vertex
 from .measureit_arch_geometry import draw_arc
+from .measureit_arch_cache import invalidate_referenced
+from .measureit_arch_textures import invalidate_text
 from mathutils import Vector, Matrix
 import math
 
@@ -155,6 +157,7 @@ class AddAnnotationButton(Operator):
                     annotationGen.num_annotations +=1
                     newAnnotation = annotationGen.annotations.add()
                     newAnnotation.annotationAnchor = mylist[0]
+                    invalidate_referenced(mainobject)
                     
                     context.area.tag_redraw()  
                     update_custom_props(newAnnotation, context)
@@ -169,6 +172,7 @@ class AddAnnotationButton(Operator):
                 context.area.tag_redraw()  
                 update_custom_props(newAnnotation,context)
             
+            invalidate_text()
             newAnnotation.itemType = 'A'
             newAnnotation.annotationAnchorObject = mainobject
             newAnnotation.style = scene.measureit_arch_default_annotation_style
@@ -7,9 +7,12 @@ from mathutils import Matrix
 from bpy.types import PropertyGroup, Panel, Object, Operator, SpaceView3D
 from bpy.props import IntProperty, CollectionProperty, FloatVectorProperty, BoolProperty, StringProperty, \
                 FloatProperty, EnumProperty, PointerProperty
+from .measureit_arch_cache import invalidate_referenced, bump_props_revision
+from .measureit_arch_textures import invalidate_text
 
 def update_flag(self,context):
     self.text_updated = True
+    bump_props_revision(self.id_data)
 
 class BaseProp:
     is_style: BoolProperty(name= "is Style",
@@ -206,6 +209,9 @@ class DeletePropButton(Operator):
         # Delete element
         itemGroup[self.tag].free = True
         itemGroup.remove(self.tag)
+        if self.is_style is False:
+            invalidate_referenced(mainObj)
+            invalidate_text()
         # redraw
         context.area.tag_redraw()
 
@@ -272,6 +278,9 @@ class DeleteAllItemsButton(Operator):
                 for annotation in mainobject.AnnotationGenerator[0].annotations:
                     mainobject.AnnotationGenerator[0].annotations.remove(0)
                     mainobject.AnnotationGenerator[0].num_annotations = 0
+
+            invalidate_referenced(mainobject)
+            invalidate_text()
     
         for window in bpy.context.window_manager.windows:
             screen = window.screen
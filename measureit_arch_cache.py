@@ -0,0 +1,569 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# ----------------------------------------------------------
+# File: measureit_arch_cache.py
+# Session caches for the mesh data used by the draw routines
+# Author: Kevan Cress
+#
+# ----------------------------------------------------------
+import bpy
+import bmesh
+import numpy as np
+from itertools import chain
+from bpy.app.handlers import persistent
+
+# Object space vertex positions keyed by object name.
+# Kept outside of the datablock so drawing never writes ID properties.
+# Names are reused after renames, so entries also store the object
+# identity (see get_object_id) and entries of removed names are pruned
+_vertex_cache = {}
+
+# Geometry revision per object name, bumped from depsgraph updates
+_revisions = {}
+
+# Sorted array of the vertex indices used by an objects
+# lines, dimensions and annotations, keyed by object name
+# as (object identity, indices)
+_referenced = {}
+
+# Evaluated (modifier applied) geometry keyed by object name.
+# Owns the only copy of the evaluated mesh data, the temporary
+# meshes from to_mesh are released as soon as they are read
+_eval_cache = {}
+
+# Draw data built by the draw routines, keyed by object name and
+# then by item key. Each entry holds the signature it was built for
+_batch_cache = {}
+
+# Resolved dimension geometry keyed by the dimensions pointer and the
+# matrix it was drawn with, so each instance keeps its own entry.
+# Each entry holds the signature it was resolved for
+_resolved_dims = {}
+
+# Position of each style by name, keyed by scene name and style
+# collection. Rebuilt lazily after styles are added, removed or edited
+_style_index = {}
+
+# Bumped whenever an item property with an update_flag callback changes.
+# Items bump the revision of the object that owns them, keyed by
+# object name. Styles are owned by the scene and bump the shared one
+_props_revision = 0
+_props_revisions = {}
+
+# Drop an objects draw data once this many item/matrix pairs are cached,
+# keeps animated or heavily instanced objects from growing the cache
+MAX_BATCHES_PER_OBJECT = 256
+
+# Same for the resolved dimensions of all objects together
+MAX_RESOLVED_DIMS = 4096
+
+# Index used by items anchored to the object origin instead of a vertex
+ORIGIN_INDEX = 9999999
+
+# Above this fraction of the mesh it is cheaper to bulk copy
+# every vertex than to look up the referenced ones individually
+SPARSE_FETCH_RATIO = 1 / 64
+
+
+# --------------------------------------------------------------------
+# Vertex positions for the referenced indices of an object
+# Indexed by mesh vertex index like the full vertex array,
+# indices that were not referenced yet are fetched on demand
+# --------------------------------------------------------------------
+class SparseVerts():
+    def __init__(self, myobj, indices):
+        self.objName = myobj.name
+        self.count, self.indices, self.coords = fetch_vertices(myobj, indices)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, idx):
+        row = np.searchsorted(self.indices, idx)
+        if row >= len(self.indices) or self.indices[row] != idx:
+            if idx < 0 or idx >= self.count:
+                raise IndexError("vertex index " + str(idx) + " out of range")
+            self.extend(idx)
+            row = np.searchsorted(self.indices, idx)
+        return self.coords[row]
+
+    # Gather the positions for an array of vertex indices
+    def take(self, indices):
+        indices = np.asarray(indices, dtype=np.int32)
+        rows = self.find_rows(indices)
+        missing = rows < 0
+        if np.any(missing):
+            if np.any((indices < 0) | (indices >= self.count)):
+                raise IndexError("vertex index out of range")
+            self.extend(indices[missing])
+            rows = self.find_rows(indices)
+        return self.coords[rows]
+
+    # Row of each index in the coordinate array, -1 when not fetched
+    def find_rows(self, indices):
+        if len(self.indices) == 0:
+            return np.full(len(indices), -1, dtype=np.intp)
+        rows = np.searchsorted(self.indices, indices)
+        rows = np.minimum(rows, len(self.indices) - 1)
+        rows[self.indices[rows] != indices] = -1
+        return rows
+
+    # Add vertices referenced from another object (eg. dimObjectB)
+    def extend(self, idx):
+        myobj = bpy.data.objects.get(self.objName)
+        indices = np.union1d(get_referenced_indices(myobj), idx).astype(np.int32)
+        _referenced[self.objName] = (get_object_id(myobj), indices)
+        self.count, self.indices, self.coords = fetch_vertices(myobj, indices)
+
+
+# --------------------------------------------------------------------
+# Get the geometry revision of an object
+# --------------------------------------------------------------------
+def get_revision(myobj):
+    return _revisions.get(myobj.name, 0)
+
+
+# --------------------------------------------------------------------
+# Identity of an object and its data
+# Caches are keyed by name, this tells apart two objects that
+# swapped names, which does not send a geometry update
+# --------------------------------------------------------------------
+def get_object_id(myobj):
+    data = myobj.data
+    return (myobj.as_pointer(), data.as_pointer() if data is not None else 0)
+
+
+# --------------------------------------------------------------------
+# Get cached vertex data for an object
+# Only rebuilt when the object geometry, mode, modifier evaluation
+# setting or referenced indices have changed since the last request
+# --------------------------------------------------------------------
+def get_obverts(myobj):
+    if myobj is None:
+        return None
+
+    key = (get_object_id(myobj), get_revision(myobj), myobj.mode,
+           bpy.context.scene.measureit_arch_eval_mods)
+    entry = _vertex_cache.get(myobj.name)
+    if entry is None or entry['key'] != key:
+        if myobj.type == 'MESH':
+            verts = SparseVerts(myobj, get_referenced_indices(myobj))
+        else:
+            verts = None
+        entry = {
+            'key': key,
+            'data': myobj.data.name if myobj.data is not None else '',
+            'verts': verts
+        }
+        _vertex_cache[myobj.name] = entry
+    return entry['verts']
+
+
+# --------------------------------------------------------------------
+# Get cached draw data for an item
+# itemKey: hashable key of the item within the object
+# signature: everything the draw data depends on
+# returns the data or None when it has to be rebuilt
+# --------------------------------------------------------------------
+def get_cached_data(myobj, itemKey, signature):
+    entry = _batch_cache.get(myobj.name, {}).get(itemKey)
+    if entry is not None and entry['sig'] == signature:
+        return entry['data']
+    return None
+
+
+def set_cached_data(myobj, itemKey, signature, data):
+    objBatches = _batch_cache.setdefault(myobj.name, {})
+    if itemKey not in objBatches and len(objBatches) >= MAX_BATCHES_PER_OBJECT:
+        objBatches.clear()
+    objBatches[itemKey] = {'sig': signature, 'data': data}
+    return data
+
+
+# --------------------------------------------------------------------
+# Get the resolved geometry of a dimension
+# mat: the matrix the dimension is drawn with, object or instance
+# returns the data or None when it has to be resolved again
+# --------------------------------------------------------------------
+def get_resolved_dim(dim, mat, signature):
+    entry = _resolved_dims.get(get_resolved_key(dim, mat))
+    if entry is not None and entry['sig'] == signature:
+        return entry['data']
+    return None
+
+
+def set_resolved_dim(dim, mat, signature, data):
+    key = get_resolved_key(dim, mat)
+    if key not in _resolved_dims and len(_resolved_dims) >= MAX_RESOLVED_DIMS:
+        _resolved_dims.clear()
+    _resolved_dims[key] = {'sig': signature, 'data': data}
+    return data
+
+
+def get_resolved_key(dim, mat):
+    matKey = tuple(tuple(row) for row in mat)
+    return (dim.as_pointer(), matKey)
+
+
+# --------------------------------------------------------------------
+# Get a style by name without scanning the style collection
+# styleType: 'alignedDimensions', 'annotations' or 'line_groups'
+# returns fallback when the scene has no style of that name
+# --------------------------------------------------------------------
+def get_style(scene, styleType, name, fallback=None):
+    if 'StyleGenerator' not in scene:
+        return fallback
+    styles = getattr(scene.StyleGenerator[0], styleType)
+
+    key = (scene.name, styleType)
+    index = _style_index.get(key)
+    if index is not None:
+        idx = index.get(name)
+        # Renames do not run an update callback, check the hit is current
+        if idx is not None and idx < len(styles) and styles[idx].name == name:
+            return styles[idx]
+
+    index = {}
+    for idx, style in enumerate(styles):
+        index[style.name] = idx
+    _style_index[key] = index
+
+    idx = index.get(name)
+    if idx is None:
+        return fallback
+    return styles[idx]
+
+
+def invalidate_style_index():
+    _style_index.clear()
+
+
+# --------------------------------------------------------------------
+# Signature of the geometry an objects draw data is built from
+# --------------------------------------------------------------------
+def get_geometry_signature(myobj):
+    return (get_object_id(myobj), get_revision(myobj), myobj.mode,
+            bpy.context.scene.measureit_arch_eval_mods, _props_revision,
+            _props_revisions.get(myobj.name, 0))
+
+
+# owner: the ID the changed property belongs to (its id_data)
+def bump_props_revision(owner=None):
+    global _props_revision
+    if isinstance(owner, bpy.types.Object):
+        _props_revisions[owner.name] = _props_revisions.get(owner.name, 0) + 1
+    else:
+        _props_revision += 1
+    _style_index.clear()
+
+
+# --------------------------------------------------------------------
+# Collect the vertex indices used by an objects items
+# --------------------------------------------------------------------
+def get_referenced_indices(myobj):
+    objectId = get_object_id(myobj)
+    entry = _referenced.get(myobj.name)
+    if entry is not None and entry[0] == objectId:
+        return entry[1]
+
+    refs = []
+    if 'LineGenerator' in myobj:
+        for lineGroup in myobj.LineGenerator[0].line_groups:
+            numLines = len(lineGroup.singleLine)
+            for pointProp in ('pointA', 'pointB'):
+                points = np.empty(numLines, dtype=np.int32)
+                lineGroup.singleLine.foreach_get(pointProp, points)
+                refs.append(points)
+
+    if 'DimensionGenerator' in myobj:
+        dimGen = myobj.DimensionGenerator[0]
+        for dim in list(dimGen.alignedDimensions) + list(dimGen.axisDimensions):
+            if dim.dimObjectA == myobj:
+                refs.append([dim.dimPointA])
+            if dim.dimObjectB == myobj:
+                refs.append([dim.dimPointB])
+        for dim in dimGen.angleDimensions:
+            refs.append([dim.dimPointA, dim.dimPointB, dim.dimPointC])
+
+    if 'AnnotationGenerator' in myobj:
+        for annotation in myobj.AnnotationGenerator[0].annotations:
+            refs.append([annotation.annotationAnchor])
+
+    if len(refs) > 0:
+        indices = np.unique(np.concatenate(refs).astype(np.int32))
+        indices = indices[(indices >= 0) & (indices != ORIGIN_INDEX)]
+    else:
+        indices = np.empty(0, dtype=np.int32)
+
+    _referenced[myobj.name] = (objectId, indices)
+    return indices
+
+
+# --------------------------------------------------------------------
+# Rebuild the referenced indices after items were added or removed
+# --------------------------------------------------------------------
+def invalidate_referenced(myobj):
+    if myobj.name in _referenced:
+        del _referenced[myobj.name]
+    if myobj.name in _vertex_cache:
+        del _vertex_cache[myobj.name]
+    if myobj.name in _batch_cache:
+        del _batch_cache[myobj.name]
+
+
+# --------------------------------------------------------------------
+# Invalidate cached data for an object
+# --------------------------------------------------------------------
+def invalidate_object(name):
+    _revisions[name] = _revisions.get(name, 0) + 1
+    if name in _vertex_cache:
+        del _vertex_cache[name]
+    if name in _eval_cache:
+        del _eval_cache[name]
+    if name in _batch_cache:
+        del _batch_cache[name]
+
+
+# --------------------------------------------------------------------
+# Invalidate cached data for every object using a mesh
+# --------------------------------------------------------------------
+def invalidate_mesh(name):
+    for objName, entry in list(_vertex_cache.items()):
+        if entry['data'] == name:
+            invalidate_object(objName)
+
+
+# --------------------------------------------------------------------
+# Drop the entries of objects that were removed or renamed
+# --------------------------------------------------------------------
+def prune_caches():
+    objects = bpy.data.objects
+    for cache in (_vertex_cache, _revisions, _referenced, _eval_cache, _batch_cache,
+                  _props_revisions):
+        for name in [name for name in cache if name not in objects]:
+            del cache[name]
+
+
+def clear_caches():
+    _vertex_cache.clear()
+    _revisions.clear()
+    _referenced.clear()
+    _eval_cache.clear()
+    _batch_cache.clear()
+    _props_revisions.clear()
+    _resolved_dims.clear()
+    _style_index.clear()
+
+
+# --------------------------------------------------------------------
+# Get the object space position of a set of vertex indices
+# returns the total vertex count, the valid indices and their positions
+# --------------------------------------------------------------------
+def fetch_vertices(myobj, indices):
+    if myobj.mode == 'EDIT':
+        bm = bmesh.from_edit_mesh(myobj.data)
+        count = len(bm.verts)
+        indices = indices[indices < count]
+        bm.verts.ensure_lookup_table()
+        coords = [bm.verts[int(idx)].co for idx in indices]
+
+    elif use_evaluated_mesh(myobj):
+        # Modifiers have to be evaluated as a whole, gather from the full array
+        obverts = get_mesh_vertices(myobj)
+        count = len(obverts)
+        indices = indices[indices < count]
+        return count, indices, obverts[indices]
+
+    else:
+        vertices = myobj.data.vertices
+        count = len(vertices)
+        indices = indices[indices < count]
+        if len(indices) > count * SPARSE_FETCH_RATIO:
+            return count, indices, get_vertex_array(vertices)[indices]
+        coords = [vertices[int(idx)].co for idx in indices]
+
+    obverts = np.array(coords, dtype=np.float32).reshape((len(indices), 3))
+    return count, indices, obverts
+
+
+# --------------------------------------------------------------------
+# Get vertex data as an (N,3) float32 array
+# mainobject
+# --------------------------------------------------------------------
+def get_mesh_vertices(myobj):
+    try:
+        if myobj.type == 'MESH':
+            if myobj.mode == 'EDIT':
+                # BMesh has no foreach_get, read all coordinates in a single
+                # pass instead of copying a Vector per vertex
+                bm = bmesh.from_edit_mesh(myobj.data)
+                numVerts = len(bm.verts)
+                coords = chain.from_iterable(vert.co for vert in bm.verts)
+                obverts = np.fromiter(coords, dtype=np.float32, count=numVerts * 3)
+                return obverts.reshape((numVerts, 3))
+            else:
+                if use_evaluated_mesh(myobj):
+                    deps = bpy.context.view_layer.depsgraph
+                    return get_evaluated_mesh(myobj, deps)['verts']
+                return get_vertex_array(myobj.data.vertices)
+        else: return None
+    except AttributeError:
+        return None
+
+
+# --------------------------------------------------------------------
+# Get the evaluated geometry of an object
+# returns a dict with the object space 'verts' (N,3) float32 array
+# and, when with_tris is set, the 'tris' (T,3) int32 index array.
+# Entries are keyed by geometry revision so the viewport and the
+# render share a single evaluation per update. Frame changes only bump
+# the revision of objects whose evaluated geometry changed, so static
+# meshes keep their data (and render batches) across animation frames
+# --------------------------------------------------------------------
+def get_evaluated_mesh(myobj, deps, with_tris=False):
+    myobj = myobj.original
+    key = get_evaluated_key(myobj)
+    entry = _eval_cache.get(myobj.name)
+    if entry is not None and entry['key'] == key:
+        if not with_tris or entry['tris'] is not None:
+            return entry
+
+    obj_eval = myobj.evaluated_get(deps)
+    mesh = obj_eval.to_mesh(depsgraph=deps)
+    try:
+        verts = get_vertex_array(mesh.vertices)
+        tris = None
+        if with_tris:
+            mesh.calc_loop_triangles()
+            tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+            mesh.loop_triangles.foreach_get('vertices', tris)
+            tris = tris.reshape((len(mesh.loop_triangles), 3))
+    finally:
+        obj_eval.to_mesh_clear()
+
+    entry = {'key': key, 'verts': verts, 'tris': tris}
+    _eval_cache[myobj.name] = entry
+    return entry
+
+
+# --------------------------------------------------------------------
+# Key of the evaluated geometry of an object, data built from
+# get_evaluated_mesh can be checked against it without evaluating
+# --------------------------------------------------------------------
+def get_evaluated_key(myobj):
+    myobj = myobj.original
+    return (get_object_id(myobj), get_revision(myobj))
+
+
+# --------------------------------------------------------------------
+# Drop the triangles of an evaluated mesh once they were copied
+# into a batch, only the vertices are needed after that
+# --------------------------------------------------------------------
+def release_evaluated_tris(myobj):
+    entry = _eval_cache.get(myobj.original.name)
+    if entry is not None:
+        entry['tris'] = None
+
+
+# --------------------------------------------------------------------
+# Bulk copy vertex coordinates with foreach_get
+# --------------------------------------------------------------------
+def get_vertex_array(vertices):
+    obverts = np.empty(len(vertices) * 3, dtype=np.float32)
+    vertices.foreach_get('co', obverts)
+    return obverts.reshape((len(vertices), 3))
+
+
+# --------------------------------------------------------------------
+# Whether vertex positions have to come from the evaluated mesh
+# Objects without modifiers always read their own data, evaluating
+# them would only copy the same coordinates
+# --------------------------------------------------------------------
+def use_evaluated_mesh(myobj):
+    if len(myobj.modifiers) == 0:
+        return False
+    return bpy.context.scene.measureit_arch_eval_mods or check_mods(myobj)
+
+
+def check_mods(myobj):
+    goodMods = ["DATA_TRANSFER ", "NORMAL_EDIT", "WEIGHTED_NORMAL",
+                'UV_PROJECT', 'UV_WARP', 'ARRAY', 'DECIMATE',
+                'EDGE_SPLIT', 'MASK', 'MIRROR', 'MULTIRES', 'SCREW',
+                'SOLIDIFY', 'SUBSURF', 'TRIANGULATE', 'ARMATURE',
+                'CAST', 'CURVE', 'DISPLACE', 'HOOK', 'LAPLACIANDEFORM',
+                'LATTICE', 'MESH_DEFORM', 'SHRINKWRAP', 'SIMPLE_DEFORM',
+                'SMOOTH', 'CORRECTIVE_SMOOTH', 'LAPLACIANSMOOTH',
+                'SURFACE_DEFORM', 'WARP', 'WAVE', 'CLOTH', 'COLLISION',
+                'DYNAMIC_PAINT', 'PARTICLE_INSTANCE', 'PARTICLE_SYSTEM',
+                'SMOKE', 'SOFT_BODY', 'SURFACE','SOLIDIFY']
+    if myobj.modifiers == None:
+        return False
+    for mod in myobj.modifiers:
+        if mod.type not in goodMods:
+            return False
+    return True
+
+
+# ------------------------------------------------------
+# Handler to invalidate cached geometry
+# Runs after depsgraph updates and after frame changes, which
+# do not send depsgraph_update_post. Transform only changes are
+# skipped, the draw routines apply the object matrix themselves.
+# The depsgraph argument is only passed from Blender 2.81 on
+# ------------------------------------------------------
+@persistent
+def depsgraph_update_handler(scene, depsgraph=None):
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    prune_caches()
+
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        updateId = update.id.original
+        if isinstance(updateId, bpy.types.Object):
+            invalidate_object(updateId.name)
+        elif isinstance(updateId, bpy.types.Mesh):
+            invalidate_mesh(updateId.name)
+
+
+@persistent
+def cache_load_handler(dummy):
+    clear_caches()
+
+
+# Handlers are added on register, auto_load only imports the module once
+# so appending at import would lose them after the add-on is re-enabled
+def register():
+    for handlers in (bpy.app.handlers.depsgraph_update_post, bpy.app.handlers.frame_change_post):
+        if depsgraph_update_handler not in handlers:
+            handlers.append(depsgraph_update_handler)
+    if cache_load_handler not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(cache_load_handler)
+
+
+def unregister():
+    clear_caches()
+    for handlers in (bpy.app.handlers.depsgraph_update_post, bpy.app.handlers.frame_change_post):
+        if depsgraph_update_handler in handlers:
+            handlers.remove(depsgraph_update_handler)
+    if cache_load_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(cache_load_handler)
@@ -0,0 +1,128 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# ----------------------------------------------------------
+# File: measureit_arch_culling.py
+# View frustum and level of detail tests so items outside the view
+# or too small to read skip building their geometry, text and batches
+# Author: Kevan Cress
+#
+# ----------------------------------------------------------
+import numpy as np
+
+# World space planes (a, b, c, d) of the frustum being drawn,
+# None when nothing is culled
+_planes = None
+
+# World to clip space matrix and viewport size in pixels of the view
+# being drawn, level of detail is off while either is None
+_matrix = None
+_viewport = None
+
+# Levels of detail, each level also drops what the ones before it drop
+LOD_FULL = 0
+LOD_NO_TEXT = 1
+LOD_NO_CAPS = 2
+LOD_HIDDEN = 3
+
+
+# --------------------------------------------------------------------
+# Set the frustum items are tested against
+# matrix: world to clip space matrix of the view or camera,
+#         None to draw everything
+# viewport: (width, height) in pixels to enable level of detail
+# --------------------------------------------------------------------
+def set_view_frustum(matrix, viewport=None):
+    global _planes
+    global _matrix
+    global _viewport
+    if matrix is None:
+        _planes = None
+        _matrix = None
+        _viewport = None
+        return
+
+    m4 = np.array(matrix, dtype=np.float64)
+    _matrix = m4
+    _viewport = viewport
+    _planes = np.array([
+        m4[3] + m4[0],
+        m4[3] - m4[0],
+        m4[3] + m4[1],
+        m4[3] - m4[1],
+        m4[3] + m4[2],
+        m4[3] - m4[2]])
+
+
+# --------------------------------------------------------------------
+# Test an axis aligned box against the frustum
+# returns False only when the box is fully outside one of the planes
+# --------------------------------------------------------------------
+def box_in_view(boxMin, boxMax):
+    if _planes is None:
+        return True
+
+    normals = _planes[:, :3]
+    # corner of the box furthest along each plane normal
+    corners = np.where(normals >= 0, boxMax, boxMin)
+    distances = (corners * normals).sum(axis=1) + _planes[:, 3]
+    return not np.any(distances < 0)
+
+
+# --------------------------------------------------------------------
+# Test the bounds of some world space points
+# margin: how far the item reaches past its points
+# --------------------------------------------------------------------
+def points_in_view(points, margin=0):
+    if _planes is None:
+        return True
+
+    points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+    if len(points) == 0:
+        return False
+    return box_in_view(points.min(axis=0) - margin, points.max(axis=0) + margin)
+
+
+# --------------------------------------------------------------------
+# Pixels per world unit at a point of the view
+# --------------------------------------------------------------------
+def get_pixel_scale(point):
+    w = _matrix[3, :3].dot(point) + _matrix[3, 3]
+    if w <= 0:
+        return float('inf')
+    return _viewport[1] / 2 * np.linalg.norm(_matrix[1, :3]) / w
+
+
+# --------------------------------------------------------------------
+# Level of detail of an item
+# anchor: world space point the item is drawn around
+# itemSize: world space size of the item including its text
+# --------------------------------------------------------------------
+def get_lod(scene, anchor, itemSize):
+    if not scene.measureit_arch_lod or _matrix is None or _viewport is None:
+        return LOD_FULL
+
+    pixels = itemSize * get_pixel_scale(np.asarray(anchor, dtype=np.float64))
+    if pixels < scene.measureit_arch_lod_hide:
+        return LOD_HIDDEN
+    if pixels < scene.measureit_arch_lod_caps:
+        return LOD_NO_CAPS
+    if pixels < scene.measureit_arch_lod_text:
+        return LOD_NO_TEXT
+    return LOD_FULL
@@ -29,6 +29,8 @@ from bpy.props import IntProperty, CollectionProperty, FloatVectorProperty, Bool
                       FloatProperty, EnumProperty, PointerProperty
 from .measureit_arch_main import *
 from .measureit_arch_baseclass import BaseWithText
+from .measureit_arch_cache import invalidate_referenced
+from .measureit_arch_textures import invalidate_text
 
 # ------------------------------------------------------------------
 # Define property group class for measureit_arch faces index
@@ -300,6 +302,8 @@ class AddAlignedDimensionButton(Operator):
 
                         # redraw
                         recalc_dimWrapper_index(self,context)
+                        invalidate_referenced(mainobject)
+                        invalidate_text()
                         context.area.tag_redraw()
                     else:
                         self.report({'ERROR'},
@@ -360,6 +364,9 @@ class AddAlignedDimensionButton(Operator):
                 newWrapper = DimGen.wrappedDimensions.add()
                 newWrapper.itemType = 'D-ALIGNED'
                 recalc_dimWrapper_index(self,context)
+                invalidate_referenced(mainobject)
+                invalidate_text()
+                invalidate_referenced(linkobject)
 
                 context.area.tag_redraw()
 
@@ -460,6 +467,8 @@ class AddAxisDimensionButton(Operator):
 
                         # redraw
                         recalc_dimWrapper_index(self,context)
+                        invalidate_referenced(mainobject)
+                        invalidate_text()
                         context.area.tag_redraw()
                     else:
                         self.report({'ERROR'},
@@ -520,6 +529,9 @@ class AddAxisDimensionButton(Operator):
                 newWrapper = DimGen.wrappedDimensions.add()
                 newWrapper.itemType = 'D-AXIS'
                 recalc_dimWrapper_index(self,context)
+                invalidate_referenced(mainobject)
+                invalidate_text()
+                invalidate_referenced(linkobject)
 
                 context.area.tag_redraw()
 
@@ -789,6 +801,8 @@ class AddAngleButton(Operator):
                 newDimension.dimPointA = mylist[0]
                 newDimension.dimPointB = mylist[1]
                 newDimension.dimPointC = mylist[2]
+                invalidate_referenced(mainobject)
+                invalidate_text()
                 newDimension.dimRadius = 0.25
                 newDimension.lineWeight = 1
                 newDimension.color = scene.measureit_arch_default_color
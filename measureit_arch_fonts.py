@@ -0,0 +1,76 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# ----------------------------------------------------------
+# File: measureit_arch_fonts.py
+# Registry of the blf font ids used to render text
+# Author: Kevan Cress
+#
+# ----------------------------------------------------------
+import bpy
+import blf
+
+# blf font id per font filepath, each font file is only loaded once
+_font_ids = {}
+
+
+# --------------------------------------------------------------------
+# Get the blf font id for a VectorFont
+# Falls back to the default font (0) for missing or builtin fonts
+# --------------------------------------------------------------------
+def get_font_id(vecFont):
+    if vecFont is None:
+        return 0
+
+    fontPath = vecFont.filepath
+    font_id = _font_ids.get(fontPath)
+    if font_id is None:
+        font_id = blf.load(fontPath)
+        _font_ids[fontPath] = font_id
+
+    if font_id == -1:
+        return 0
+    return font_id
+
+
+# --------------------------------------------------------------------
+# Get the blf font id for an items font property
+# The builtin Bfont is drawn with the default font
+# --------------------------------------------------------------------
+def get_props_font_id(props):
+    badfonts = [None]
+    if 'Bfont' in bpy.data.fonts:
+        badfonts.append(bpy.data.fonts['Bfont'])
+    if props.font not in badfonts:
+        return get_font_id(props.font)
+    return 0
+
+
+# --------------------------------------------------------------------
+# Unload every font loaded by the registry
+# --------------------------------------------------------------------
+def unload_fonts():
+    for fontPath, font_id in _font_ids.items():
+        if font_id != -1:
+            blf.unload(fontPath)
+    _font_ids.clear()
+
+
+def unregister():
+    unload_fonts()
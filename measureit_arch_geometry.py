@@ -38,48 +38,47 @@ from bpy_extras import view3d_utils, mesh_utils
 import bpy_extras.object_utils as object_utils
 from sys import exc_info
 from .shaders import *
+from .measureit_arch_cache import get_obverts, get_cached_data, set_cached_data, \
+                get_geometry_signature, get_resolved_dim, set_resolved_dim, get_style, \
+                ORIGIN_INDEX
+from .measureit_arch_renderlist import get_render_list, DEPTH_TEXTURE
+from .measureit_arch_shaders import get_shader
+from .measureit_arch_fonts import get_props_font_id
+from .measureit_arch_culling import points_in_view, box_in_view, get_lod, \
+                LOD_FULL, LOD_NO_CAPS, LOD_HIDDEN
+from .measureit_arch_sdf import get_glyph_atlas, get_text_quads, map_to_card
+from .measureit_arch_textures import get_text_region, queue_text, flush_text, \
+                has_text_image, queue_text_raster, mark_text_drawn, is_text_drawn, \
+                rasterize_text_queue
 import math
 import time
 import numpy as np
 from array import array
 
-# define Shaders
-shader = gpu.types.GPUShader(
-    Base_Shader_2D.vertex_shader,
-    Base_Shader_2D.fragment_shader)
-
-lineShader = gpu.types.GPUShader(
-    Base_Shader_3D.vertex_shader,
-    Line_Shader_3D.fragment_shader,
-    geocode=Line_Shader_3D.geometry_shader)
-
-triShader = gpu.types.GPUShader(
-    Base_Shader_3D.vertex_shader,
-    Base_Shader_3D.fragment_shader)
-
-dashedLineShader = gpu.types.GPUShader(
-    Dashed_Shader_3D.vertex_shader,
-    Dashed_Shader_3D.fragment_shader,
-    geocode=Dashed_Shader_3D.geometry_shader)
-
-pointShader = gpu.types.GPUShader(
-    Point_Shader_3D.vertex_shader,
-    Point_Shader_3D.fragment_shader,
-    geocode=Point_Shader_3D.geometry_shader)
-
-textShader = gpu.types.GPUShader(
-    Text_Shader.vertex_shader,
-    Text_Shader.fragment_shader)
-
 fontSizeMult = 6
 
+# Text cards the render drew as (textobj, props, card, uvs).
+# The render has no next redraw to pick up new text, so these are
+# measured and rasterized together before they are drawn
+_render_text = []
+
 
 def update_text(textobj, props, context):
+    # Only labels the 3D pass drew at full detail are measured and
+    # rasterized, the others are done once they come into view
+    if not is_text_drawn(textobj):
+        return
+
     update_flag = False
     for textField in textobj.textField:
         if textField.text_updated:
             update_flag = True
             
+    # Text pixels are not saved, rasterize again after load,
+    # undo or when the pixel store dropped them
+    if not context.scene.measureit_arch_sdf_text and not has_text_image(textobj):
+        update_flag = True
+
     if textobj.text_updated is True or props.text_updated is True or update_flag:
         # Get textitem Properties
         rawRGB = props.color
@@ -88,15 +87,7 @@ def update_text(textobj, props, context):
         resolution = props.textResolution
 
         # Get Font Id
-        badfonts = [None]
-        if 'Bfont' in bpy.data.fonts:
-            badfonts.append(bpy.data.fonts['Bfont'])
-        if props.font not in badfonts:
-            vecFont = props.font
-            fontPath = vecFont.filepath
-            font_id = blf.load(fontPath)
-        else:
-            font_id = 0
+        font_id = get_props_font_id(props)
 
         # Get Text
         text = ""
@@ -132,58 +123,48 @@ def update_text(textobj, props, context):
         textobj.textHeight = height
         textobj.textWidth = width
 
-        # Start Offscreen Draw
+        # SDF text is laid out from glyphs at draw time, nothing to rasterize
+        if context.scene.measureit_arch_sdf_text:
+            textobj.text_updated = False
+            for textField in textobj.textField:
+                textField.text_updated = False
+            return
+
+        # Rasterized together with all other labels at the end of the frame
         if width != 0 and height != 0:
-            textOffscreen = gpu.types.GPUOffScreen(width, height)
-            texture_buffer = bgl.Buffer(bgl.GL_BYTE, width * height * 4)
-            
-            with textOffscreen.bind():
-                # Clear Past Draw and Set 2D View matrix
-                bgl.glClearColor(rgb[0], rgb[1], rgb[2], 0)
-                bgl.glClear(bgl.GL_COLOR_BUFFER_BIT)
-                
-                view_matrix = Matrix([
-                    [2 / width, 0, 0, -1],
-                    [0, 2 / height, 0, -1],
-                    [0, 0, 1, 0],
-                    [0, 0, 0, 1]])
-                
-                gpu.matrix.reset()
-                gpu.matrix.load_matrix(view_matrix)
-                gpu.matrix.load_projection_matrix(Matrix.Identity(4))
-
-                if len(textobj.textField) > 0:
-                    linenum = 1
-                    for textField in textobj.textField:
-                        ypos = height - (lineHeight*linenum) + lineHeight/5
-                        blf.position(font_id, 0, ypos, 0)
-                        blf.draw(font_id, textField.text)
-                        linenum += 1
-
-                else:        
-                    blf.position(font_id, 0, height/5, 0)
-                    blf.draw(font_id, text)
-                
-                # Read Offscreen To Texture Buffer
-                bgl.glReadBuffer(bgl.GL_BACK)
-                bgl.glReadPixels(0, 0, width, height, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, texture_buffer)
-                
-                # Write Texture Buffer to ID Property as List
-                if 'texture' in textobj:
-                    del textobj['texture']
-                textobj['texture'] = texture_buffer
-                textOffscreen.free()
-                textobj.text_updated = False
-                textobj.texture_updated = True
-            
-        # generate image datablock from buffer for debug preview
-        # ONLY USE FOR DEBUG. SERIOUSLY SLOWS PREFORMANCE
-        if context.scene.measureit_arch_debug_text:
-            if not str('test') in bpy.data.images:
-                bpy.data.images.new(str('test'), width, height)
-            image = bpy.data.images[str('test')]
-            image.scale(width, height)
-            image.pixels = [v / 255 for v in texture_buffer]
+            if len(textobj.textField) > 0:
+                lines = [textField.text for textField in textobj.textField]
+            else:
+                lines = [text]
+            queue_text_raster(textobj, {
+                'font_id': font_id,
+                'rgb': rgb,
+                'size': size,
+                'resolution': resolution,
+                'lines': lines,
+                'lineHeight': lineHeight,
+                'width': width,
+                'height': height
+            }, get_text_priority(context, textobj))
+
+
+# --------------------------------------------------------------------
+# Rasterization order of a label
+# On screen labels come first, then the nearest to the view
+# --------------------------------------------------------------------
+def get_text_priority(context, textobj):
+    region = context.region
+    rv3d = context.region_data
+    if region is None or rv3d is None:
+        return (0, 0)
+
+    loc = Vector(textobj.gizLoc)
+    screenLoc = view3d_utils.location_3d_to_region_2d(region, rv3d, loc)
+    onScreen = (screenLoc is not None and
+                0 <= screenLoc[0] <= region.width and
+                0 <= screenLoc[1] <= region.height)
+    depth = -(rv3d.view_matrix @ loc)[2]
+    return (0 if onScreen else 1, depth)
 
 
 def draw_alignedDimension(context, myobj, measureGen, dim, mat):
@@ -196,9 +177,7 @@ def draw_alignedDimension(context, myobj, measureGen, dim, mat):
 
     dimProps = dim
     if dim.uses_style:
-        for alignedDimStyle in context.scene.StyleGenerator[0].alignedDimensions:
-            if alignedDimStyle.name == dim.style:
-                dimProps = alignedDimStyle
+        dimProps = get_style(context.scene, 'alignedDimensions', dim.style, dim)
 
     lineWeight = dimProps.lineWeight
     # check all visibility conditions
@@ -214,20 +193,11 @@ def draw_alignedDimension(context, myobj, measureGen, dim, mat):
             viewport = [context.area.width, context.area.height]
 
         # Obj Properties
-        obvertA = dim.dimObjectA['obverts']
-        obvertB = dim.dimObjectB['obverts']
+        obvertA = get_obverts(dim.dimObjectA)
+        obvertB = get_obverts(dim.dimObjectB)
         scene = context.scene
-        pr = scene.measureit_arch_gl_precision
-        textFormat = "%1." + str(pr) + "f"
         rawRGB = dimProps.color
         rgb = (pow(rawRGB[0], (1/2.2)), pow(rawRGB[1], (1/2.2)), pow(rawRGB[2], (1/2.2)), rawRGB[3])
-        
-        # Define Caps as a tuple of capA and capB to reduce code duplications
-        caps = (dimProps.endcapA, dimProps.endcapB)
-        capSize = dimProps.endcapSize
-
-        offset = dim.dimOffset
-        geoOffset = dim.dimLeaderOffset
 
         # get points positions from indicies
         aMatrix = mat
@@ -236,140 +206,146 @@ def draw_alignedDimension(context, myobj, measureGen, dim, mat):
             bMatrix = dim.dimObjectB.matrix_world - dim.dimObjectA.matrix_world + mat\
 
         # get points positions from indicies
-        if dim.dimPointA == 9999999:
+        if dim.dimPointA == ORIGIN_INDEX:
             p1 = dim.dimObjectA.location
         else:
-            p1 = get_point(obvertA[dim.dimPointA], dim.dimObjectA, aMatrix)
+            p1 = Vector(get_points(obvertA, [dim.dimPointA], aMatrix)[0])
 
-        if dim.dimPointB == 9999999:
+        if dim.dimPointB == ORIGIN_INDEX:
             p2 = dim.dimObjectB.location
         else:
-            p2 = get_point(obvertB[dim.dimPointB], dim.dimObjectB, bMatrix)
+            p2 = Vector(get_points(obvertB, [dim.dimPointB], bMatrix)[0])
 
+        # Skip dimensions outside the view
+        if not points_in_view([p1, p2], get_dim_reach(dim, dimProps)):
+            return
 
+        # Simplify dimensions that are small on screen
+        lod = get_lod(context.scene, p1, (Vector(p2) - Vector(p1)).length + get_dim_reach(dim, dimProps))
+        if lod == LOD_HIDDEN:
+            return
 
-        #check dominant Axis
-        sortedPoints = sortPoints(p1, p2)
-        p1 = sortedPoints[0]
-        p2 = sortedPoints[1]
-    
-        
-        #calculate distance & MidpointGY
-        distVector = Vector(p1)-Vector(p2)
-        dist = distVector.length
-        midpoint = interpolate3d(p1, p2, fabs(dist / 2))
-        normDistVector = distVector.normalized()
-        absNormDisVector = Vector((abs(normDistVector[0]),abs(normDistVector[1]),abs(normDistVector[2])))
 
+        # Reuse the resolved geometry while nothing it depends on changed
+        signature = get_dim_signature(context, myobj, dim, dimProps, p1, p2, lod)
+        resolved = get_resolved_dim(dim, mat, signature)
+        if resolved is None:
+            resolved = resolve_alignedDimension(context, myobj, dim, dimProps, p1, p2, lod)
+            set_resolved_dim(dim, mat, signature, resolved)
 
-        # Compute offset vector from face normal and user input
-        rotationMatrix = Matrix.Rotation(dim.dimRotation, 4, normDistVector)
-        selectedNormal = Vector(select_normal(myobj, dim, normDistVector, midpoint, dimProps))
-        
-        userOffsetVector = rotationMatrix@selectedNormal
-        offsetDistance = userOffsetVector*offset
-        geoOffsetDistance = offsetDistance.normalized()*geoOffset
-
-        if offsetDistance < geoOffsetDistance:
-            offsetDistance = geoOffsetDistance
-
-
-        #Set Gizmo Props
-        dim.gizLoc = midpoint
-        dim.gizRotDir = userOffsetVector
-        
-        # Define Lines
-        leadStartA = Vector(p1) + geoOffsetDistance
-        leadEndA = Vector(p1) + offsetDistance + (offsetDistance.normalized()*0.005*capSize)
-
-        leadStartB = Vector(p2) + geoOffsetDistance
-        leadEndB = Vector(p2) + offsetDistance + (offsetDistance.normalized()*0.005*capSize)
+            #Set Gizmo Props
+            dim.gizLoc = resolved['gizLoc']
+            dim.gizRotDir = resolved['gizRotDir']
 
-        dimLineStart = Vector(p1)+offsetDistance
-        dimLineEnd = Vector(p2)+offsetDistance
-        textLoc = interpolate3d(dimLineStart, dimLineEnd, fabs(dist / 2))
-
-        #i,j,k as card axis
-        i = Vector((1,0,0))
-        j = Vector((0,1,0))
-        k = Vector((0,0,1))
-
-
-        #format text and update if necessary
-        distanceText = str(format_distance(textFormat,dist))
-        if dim.text != str(distanceText):
-            dim.text = str(distanceText)
+        #update text if necessary
+        if dim.text != resolved['text']:
+            dim.text = resolved['text']
             dim.text_updated = True
-        
-        width = dim.textWidth
-        height = dim.textHeight 
-        
-
-        resolution = dimProps.textResolution
-        size = dimProps.fontSize/fontSizeMult
-        sx = (width/resolution)*0.1*size
-        sy = (height/resolution)*0.1*size
-        origin = Vector(textLoc)
-        cardX = normDistVector.normalized() * sx
-        cardY = userOffsetVector.normalized() *sy
-
-        flipCaps = False
-        if (cardX.length + capSize/100) > dist:
-            flipCaps=True
-            origin = Vector(dimLineEnd) - Vector(cardX/2 + cardX.normalized()*capSize/100) -Vector(cardY/2)
-        
-        square = [(origin-(cardX/2)),(origin-(cardX/2)+cardY),(origin+(cardX/2)+cardY),(origin+(cardX/2))]
-        if scene.measureit_arch_gl_show_d:
-            draw_text_3D(context,dim,myobj,square)
 
-    
+        if scene.measureit_arch_gl_show_d and lod == LOD_FULL:
+            draw_text_3D(context,dim,myobj,resolved['square'],dimProps)
 
-        #Collect coords and endcaps
-        coords = [leadStartA,leadEndA,leadStartB,leadEndB,dimLineStart,dimLineEnd]
-        filledCoords = []
-        pos = (dimLineStart,dimLineEnd)
-        i=0
-        for cap in caps:
-            capCoords = generate_end_caps(context,dimProps,cap,capSize,pos[i],userOffsetVector,textLoc,i,flipCaps)
-            i += 1 
-            for coord in capCoords[0]:
-                coords.append(coord)
-            for filledCoord in capCoords[1]:
-                filledCoords.append(filledCoord)
-
-        
-        # Keep this out of the loop to avoid extra draw calls 
-        if len(filledCoords) != 0:
-            #bind shader
-            bgl.glEnable(bgl.GL_POLYGON_SMOOTH)
-            triShader.bind()
-            triShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-            triShader.uniform_float("offset", 0)
-
-            batch = batch_for_shader(triShader, 'TRIS', {"pos": filledCoords})
-            batch.program_set(triShader)
-            batch.draw()
-            gpu.shader.unbind()
-            bgl.glDisable(bgl.GL_POLYGON_SMOOTH)
-        
-        #bind shader
-        
-        lineShader.bind()
-        lineShader.uniform_float("Viewport",viewport)
-        lineShader.uniform_float("thickness",lineWeight)
-        lineShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-        lineShader.uniform_float("offset", 0)
+        # Queue endcaps and lines, merged with other items of the same style
+        renderList = get_render_list(context)
+        queue_end_caps(context, resolved['endCaps'], rgb, lineWeight, viewport,
+                       signature=('caps', signature))
 
-        # batch & Draw Shader   
-        batch = batch_for_shader(lineShader, 'LINES', {"pos": coords})
-        batch.program_set(lineShader)
-        batch.draw()
-        gpu.shader.unbind()
+        renderList.add(get_shader('line'), 'LINES', {
+            "Viewport": viewport,
+            "thickness": lineWeight,
+            "finalColor": rgb,
+            "offset": 0}, resolved['coords'], signature=('lines', signature))
         
         #Reset openGL Settings
         bgl.glEnable(bgl.GL_DEPTH_TEST)
         bgl.glDepthMask(True)
 
+# --------------------------------------------------------------------
+# Resolve the text, card, lines and endcaps of an aligned dimension
+# --------------------------------------------------------------------
+def resolve_alignedDimension(context, myobj, dim, dimProps, p1, p2, lod):
+    scene = context.scene
+    pr = scene.measureit_arch_gl_precision
+    textFormat = "%1." + str(pr) + "f"
+    caps = (dimProps.endcapA, dimProps.endcapB)
+    capSize = dimProps.endcapSize
+    offset = dim.dimOffset
+    geoOffset = dim.dimLeaderOffset
+
+    #check dominant Axis
+    sortedPoints = sortPoints(p1, p2)
+    p1 = sortedPoints[0]
+    p2 = sortedPoints[1]
+
+    #calculate distance & Midpoint
+    distVector = Vector(p1)-Vector(p2)
+    dist = distVector.length
+    midpoint = interpolate3d(p1, p2, fabs(dist / 2))
+    normDistVector = distVector.normalized()
+
+    # Compute offset vector from face normal and user input
+    rotationMatrix = Matrix.Rotation(dim.dimRotation, 4, normDistVector)
+    selectedNormal = Vector(select_normal(myobj, dim, normDistVector, midpoint, dimProps))
+
+    userOffsetVector = rotationMatrix@selectedNormal
+    offsetDistance = userOffsetVector*offset
+    geoOffsetDistance = offsetDistance.normalized()*geoOffset
+
+    if offsetDistance < geoOffsetDistance:
+        offsetDistance = geoOffsetDistance
+
+    # Define Lines
+    leadStartA = Vector(p1) + geoOffsetDistance
+    leadEndA = Vector(p1) + offsetDistance + (offsetDistance.normalized()*0.005*capSize)
+
+    leadStartB = Vector(p2) + geoOffsetDistance
+    leadEndB = Vector(p2) + offsetDistance + (offsetDistance.normalized()*0.005*capSize)
+
+    dimLineStart = Vector(p1)+offsetDistance
+    dimLineEnd = Vector(p2)+offsetDistance
+    textLoc = interpolate3d(dimLineStart, dimLineEnd, fabs(dist / 2))
+
+    #format text
+    distanceText = str(format_distance(textFormat,dist))
+
+    width = dim.textWidth
+    height = dim.textHeight
+    resolution = dimProps.textResolution
+    size = dimProps.fontSize/fontSizeMult
+    sx = (width/resolution)*0.1*size
+    sy = (height/resolution)*0.1*size
+    origin = Vector(textLoc)
+    cardX = normDistVector.normalized() * sx
+    cardY = userOffsetVector.normalized() *sy
+
+    flipCaps = False
+    if (cardX.length + capSize/100) > dist:
+        flipCaps=True
+        origin = Vector(dimLineEnd) - Vector(cardX/2 + cardX.normalized()*capSize/100) -Vector(cardY/2)
+
+    square = [(origin-(cardX/2)),(origin-(cardX/2)+cardY),(origin+(cardX/2)+cardY),(origin+(cardX/2))]
+
+    #Collect coords and endcaps
+    coords = [leadStartA,leadEndA,leadStartB,leadEndB,dimLineStart,dimLineEnd]
+    endCaps = []
+    pos = (dimLineStart,dimLineEnd)
+    i=0
+    if lod >= LOD_NO_CAPS:
+        caps = ()
+    for cap in caps:
+        endCap = get_end_cap(dimProps,cap,capSize,pos[i],userOffsetVector,textLoc,i,flipCaps)
+        i += 1
+        if endCap is not None:
+            endCaps.append(endCap)
+
+    return {
+        'text': distanceText,
+        'gizLoc': midpoint,
+        'gizRotDir': userOffsetVector,
+        'square': square,
+        'coords': np.array(coords, dtype=np.float32),
+        'endCaps': endCaps}
+
 def draw_axisDimension(context, myobj, measureGen,dim, mat):
     # GL Settings
 
@@ -382,9 +358,7 @@ def draw_axisDimension(context, myobj, measureGen,dim, mat):
 
     dimProps = dim
     if dim.uses_style:
-        for alignedDimStyle in context.scene.StyleGenerator[0].alignedDimensions:
-            if alignedDimStyle.name == dim.style:
-                dimProps = alignedDimStyle
+        dimProps = get_style(context.scene, 'alignedDimensions', dim.style, dim)
 
     lineWeight = dimProps.lineWeight
     #check all visibility conditions
@@ -394,275 +368,249 @@ def draw_axisDimension(context, myobj, measureGen,dim, mat):
         inView = False    
     if dim.visible and dimProps.visible and inView:
 
-        # Get Viewport and CameraLoc or ViewRot
+        # Get Viewport
         if context.scene.measureit_arch_is_render_draw:
             viewport = [context.scene.render.resolution_x,context.scene.render.resolution_y]
-            cameraLoc = context.scene.camera.location.normalized()
         else:
             viewport = [context.area.width,context.area.height]
-            viewRot = context.area.spaces[0].region_3d.view_rotation
 
 
         # Obj Properties
-        obvertA = dim.dimObjectA['obverts']
-        obvertB = dim.dimObjectB['obverts']
+        obvertA = get_obverts(dim.dimObjectA)
+        obvertB = get_obverts(dim.dimObjectB)
         scene = context.scene
-        pr = scene.measureit_arch_gl_precision
-        textFormat = "%1." + str(pr) + "f"
         rawRGB = dimProps.color
         rgb = (pow(rawRGB[0],(1/2.2)),pow(rawRGB[1],(1/2.2)),pow(rawRGB[2],(1/2.2)),rawRGB[3])
-        
-        axis = dim.dimAxis
 
-        caps = (dimProps.endcapA, dimProps.endcapB)
-        capSize = dimProps.endcapSize
-
-        offset = dim.dimOffset
-        geoOffset = dim.dimLeaderOffset
-    
         # get points positions from indicies
         aMatrix = mat
         bMatrix = mat
         if dim.dimObjectB != dim.dimObjectA:
             bMatrix = dim.dimObjectB.matrix_world - dim.dimObjectA.matrix_world + mat 
 
-        if dim.dimPointA == 9999999:
+        if dim.dimPointA == ORIGIN_INDEX:
             p1 = dim.dimObjectA.location
         else:
-            p1 = get_point(obvertA[dim.dimPointA], dim.dimObjectA,aMatrix)
+            p1 = Vector(get_points(obvertA, [dim.dimPointA], aMatrix)[0])
         
-        if dim.dimPointB == 9999999:
+        if dim.dimPointB == ORIGIN_INDEX:
             p2 = dim.dimObjectB.location
         else:
-            p2 = get_point(obvertB[dim.dimPointB], dim.dimObjectB,bMatrix)
-        
-        #Sort Points 
-        sortedPoints = sortPoints(p1,p2)
-        p1 = sortedPoints[0]
-        p2 = sortedPoints[1]
-
-        #i,j,k as base vectors
-        i = Vector((1,0,0))
-        j = Vector((0,1,0))
-        k = Vector((0,0,1))
-        
-        if dim.dimViewPlane=='99':
-            viewPlane = dimProps.dimViewPlane
-        else:
-            viewPlane = dim.dimViewPlane
-
-        if viewPlane == 'XY':
-            viewAxis = k
-        elif viewPlane == 'XZ':
-            viewAxis = j
-        elif viewPlane == 'YZ':
-            viewAxis = i
-        elif viewPlane == '99':
-            if context.scene.measureit_arch_is_render_draw:
-                viewAxis = cameraLoc
-            else:
-                viewVec = k.copy()
-                viewVec.rotate(viewRot)
-                viewAxis = viewVec
-
-        # define axis relatd values
-        #basicThreshold = 0.5773
-        if axis =='X':
-            p1axis = (p1[0],0,0)
-            p2axis = (p2[0],0,0)
-            xThreshold = 0.95796
-            yThreshold = 0.22146
-            zThreshold = 0.197568
-            axisVec = i
-        elif axis == 'Y':
-            p1axis = (0,p1[1],0)
-            p2axis = (0,p2[1],0)
-            xThreshold = 0.22146
-            yThreshold = 0.95796
-            zThreshold = 0.197568
-            axisVec = j
-        elif axis == 'Z':
-            xThreshold = 0.24681
-            yThreshold = 0.24681
-            zThreshold = 0.93800
-            p1axis = (0,0,p1[2])
-            p2axis = (0,0,p2[2])
-            axisVec = k
-
-        # Divide the view space into four sectors by threshold
-        if viewAxis[0] > xThreshold:
-            viewSector = (1,0,0)
-        elif viewAxis[0] < -xThreshold:
-            viewSector = (-1,0,0)
-        
-        if viewAxis[1] > yThreshold:
-            viewSector = (0,1,0)
-        elif viewAxis[1] < -yThreshold:
-            viewSector = (0,-1,0)
-
-        if viewAxis[2] > zThreshold:
-            viewSector = (0,0,1)
-        elif viewAxis[2] < -zThreshold:
-            viewSector = (0,0,-1)
-
-        #calculate distance & Midpoint
-        distVector = Vector(p1axis)-Vector(p2axis)
-        
-        dist = distVector.length
-        midpoint = interpolate3d(p1, p2, fabs(dist / 2))
-        normDistVector = distVector.normalized()
-        absNormDistVector = Vector((abs(normDistVector[0]),abs(normDistVector[1]),abs(normDistVector[2])))
-
-        # Compute offset vector from face normal and user input
-        rotationMatrix = Matrix.Rotation(dim.dimRotation,4,normDistVector)
-        selectedNormal = Vector(select_normal(myobj,dim,normDistVector,midpoint,dimProps))
-
-        #The Direction of the Dimension Lines
-        dirVector = Vector(viewSector).cross(axisVec)
-        if dirVector.dot(selectedNormal) < 0:
-            dirVector.negate()
-        selectedNormal = dirVector.normalized()
-
-        userOffsetVector = rotationMatrix@selectedNormal
-        offsetDistance = userOffsetVector*offset
-        geoOffsetDistance = offsetDistance.normalized()*geoOffset
-        
-        if offsetDistance < geoOffsetDistance:
-            offsetDistance = geoOffsetDistance
-   
-        #Set Gizmo Props
-        dim.gizLoc = midpoint
-        dim.gizRotDir = userOffsetVector
-
-        # Define Lines
-        # get the components of p1 & p1 in the direction vector
-        p1Dir = Vector((p1[0]*dirVector[0],p1[1]*dirVector[1],p1[2]*dirVector[2]))
-        p2Dir = Vector((p2[0]*dirVector[0],p2[1]*dirVector[1],p2[2]*dirVector[2]))
-        
-        domAxis = get_dom_axis(p1Dir)
-        
-        if p1Dir[domAxis] >= p2Dir[domAxis]:
-            basePoint = p1
-            secondPoint = p2
-            secondPointAxis = Vector(p1axis) - Vector(p2axis)
-            alignedDistVector = Vector(p2)-Vector(p1)
-        else: 
-            basePoint = p2
-            secondPoint = p1
-            secondPointAxis = Vector(p2axis) - Vector(p1axis)
-            alignedDistVector = Vector(p1)-Vector(p2)
-
-        # get the difference between the points in the view axis
-        if viewPlane == '99':
-            viewAxis = Vector(viewSector)
-            if viewAxis[0]<0 or viewAxis[1]<0 or viewAxis[2]<0:
-                viewAxis*= -1
-        viewAxisDiff = Vector((alignedDistVector[0]*viewAxis[0],alignedDistVector[1]*viewAxis[1],alignedDistVector[2]*viewAxis[2]))
+            p2 = Vector(get_points(obvertB, [dim.dimPointB], bMatrix)[0])
+
+        # Skip dimensions outside the view
+        if not points_in_view([p1, p2], get_dim_reach(dim, dimProps)):
+            return
+
+        # Simplify dimensions that are small on screen
+        lod = get_lod(context.scene, p1, (Vector(p2) - Vector(p1)).length + get_dim_reach(dim, dimProps))
+        if lod == LOD_HIDDEN:
+            return
         
-        dim.gizRotAxis = alignedDistVector
+        # Reuse the resolved geometry while nothing it depends on changed
+        signature = get_dim_signature(context, myobj, dim, dimProps, p1, p2, lod, axis=dim.dimAxis)
+        resolved = get_resolved_dim(dim, mat, signature)
+        if resolved is None:
+            resolved = resolve_axisDimension(context, myobj, dim, dimProps, p1, p2, lod)
+            set_resolved_dim(dim, mat, signature, resolved)
+
+            #Set Gizmo Props
+            dim.gizLoc = resolved['gizLoc']
+            dim.gizRotDir = resolved['gizRotDir']
+            dim.gizRotAxis = resolved['gizRotAxis']
+
+        #update text if necessary
+        if dim.text != resolved['text']:
+            dim.text = resolved['text']
+            dim.text_updated = True
 
-        #Lines
-        leadStartA = Vector(basePoint) + geoOffsetDistance
-        leadEndA = Vector(basePoint)  + offsetDistance
+        if scene.measureit_arch_gl_show_d and lod == LOD_FULL:
+            draw_text_3D(context,dim,myobj,resolved['square'],dimProps)
 
-        leadEndB =  leadEndA - Vector(secondPointAxis)
-        leadStartB = Vector(secondPoint) - viewAxisDiff + geoOffsetDistance
+        # Queue endcaps and lines, merged with other items of the same style
+        renderList = get_render_list(context)
+        queue_end_caps(context, resolved['endCaps'], rgb, lineWeight, viewport,
+                       signature=('caps', signature))
 
-        viewDiffStartB = leadStartB
-        viewDiffEndB = leadStartB + viewAxisDiff
+        renderList.add(get_shader('line'), 'LINES', {
+            "Viewport": viewport,
+            "thickness": lineWeight,
+            "finalColor": rgb,
+            "offset": 0}, resolved['coords'], signature=('lines', signature))
 
-        dimLineStart = leadEndA -(offsetDistance.normalized()*0.05)
-        dimLineEnd = leadEndB-(offsetDistance.normalized()*0.05)
-        textLoc = interpolate3d(dimLineStart, dimLineEnd, fabs(dist / 2))
+        #Reset openGL Settings
+        bgl.glEnable(bgl.GL_DEPTH_TEST)
+        bgl.glDepthMask(True)
 
-        #format text and update if necessary
-        distanceText = str(format_distance(textFormat,dist))
-        if dim.text != str(distanceText):
-            dim.text = str(distanceText)
-            dim.text_updated = True
-        
-        width = dim.textWidth
-        height = dim.textHeight 
-        resolution = dimProps.textResolution
-        size = dimProps.fontSize/fontSizeMult
-        sx = (width/resolution)*0.1*size
-        sy = (height/resolution)*0.1*size
-        origin = Vector(textLoc)
-        cardX = Vector((abs(normDistVector[0]),-abs(normDistVector[1]),-abs(normDistVector[2]))) * sx
-        cardY = userOffsetVector *sy
+        #end = time.perf_counter()
+        #print(("draw time: "+ "%.3f"%((end-start)*1000)) + ' ms')  
+
+# --------------------------------------------------------------------
+# Resolve the text, card, lines and endcaps of an axis dimension
+# --------------------------------------------------------------------
+def resolve_axisDimension(context, myobj, dim, dimProps, p1, p2, lod):
+    scene = context.scene
+    pr = scene.measureit_arch_gl_precision
+    textFormat = "%1." + str(pr) + "f"
+    axis = dim.dimAxis
+    caps = (dimProps.endcapA, dimProps.endcapB)
+    capSize = dimProps.endcapSize
+    offset = dim.dimOffset
+    geoOffset = dim.dimLeaderOffset
+
+    #Sort Points
+    sortedPoints = sortPoints(p1,p2)
+    p1 = sortedPoints[0]
+    p2 = sortedPoints[1]
+
+    #i,j,k as base vectors
+    i = Vector((1,0,0))
+    j = Vector((0,1,0))
+    k = Vector((0,0,1))
+    
+    if dim.dimViewPlane=='99':
+        viewPlane = dimProps.dimViewPlane
+    else:
+        viewPlane = dim.dimViewPlane
+
+    if viewPlane == 'XY':
+        viewAxis = k
+    elif viewPlane == 'XZ':
+        viewAxis = j
+    elif viewPlane == 'YZ':
+        viewAxis = i
+    elif viewPlane == '99':
+        viewAxis = get_view_vector(context)
+
+    # define axis relatd values
+    if axis =='X':
+        p1axis = (p1[0],0,0)
+        p2axis = (p2[0],0,0)
+        axisVec = i
+    elif axis == 'Y':
+        p1axis = (0,p1[1],0)
+        p2axis = (0,p2[1],0)
+        axisVec = j
+    elif axis == 'Z':
+        p1axis = (0,0,p1[2])
+        p2axis = (0,0,p2[2])
+        axisVec = k
+
+    # Divide the view space into four sectors by threshold
+    viewSector = get_axis_view_sector(viewAxis, axis)
+
+    #calculate distance & Midpoint
+    distVector = Vector(p1axis)-Vector(p2axis)
+    
+    dist = distVector.length
+    midpoint = interpolate3d(p1, p2, fabs(dist / 2))
+    normDistVector = distVector.normalized()
+
+    # Compute offset vector from face normal and user input
+    rotationMatrix = Matrix.Rotation(dim.dimRotation,4,normDistVector)
+    selectedNormal = Vector(select_normal(myobj,dim,normDistVector,midpoint,dimProps))
+
+    #The Direction of the Dimension Lines
+    dirVector = Vector(viewSector).cross(axisVec)
+    if dirVector.dot(selectedNormal) < 0:
+        dirVector.negate()
+    selectedNormal = dirVector.normalized()
+
+    userOffsetVector = rotationMatrix@selectedNormal
+    offsetDistance = userOffsetVector*offset
+    geoOffsetDistance = offsetDistance.normalized()*geoOffset
+    
+    if offsetDistance < geoOffsetDistance:
+        offsetDistance = geoOffsetDistance
+   
+    # Define Lines
+    # get the components of p1 & p1 in the direction vector
+    p1Dir = Vector((p1[0]*dirVector[0],p1[1]*dirVector[1],p1[2]*dirVector[2]))
+    p2Dir = Vector((p2[0]*dirVector[0],p2[1]*dirVector[1],p2[2]*dirVector[2]))
+    
+    domAxis = get_dom_axis(p1Dir)
+    
+    if p1Dir[domAxis] >= p2Dir[domAxis]:
+        basePoint = p1
+        secondPoint = p2
+        secondPointAxis = Vector(p1axis) - Vector(p2axis)
+        alignedDistVector = Vector(p2)-Vector(p1)
+    else: 
+        basePoint = p2
+        secondPoint = p1
+        secondPointAxis = Vector(p2axis) - Vector(p1axis)
+        alignedDistVector = Vector(p1)-Vector(p2)
+
+    # get the difference between the points in the view axis
+    if viewPlane == '99':
+        viewAxis = Vector(viewSector)
+        if viewAxis[0]<0 or viewAxis[1]<0 or viewAxis[2]<0:
+            viewAxis*= -1
+    viewAxisDiff = Vector((alignedDistVector[0]*viewAxis[0],alignedDistVector[1]*viewAxis[1],alignedDistVector[2]*viewAxis[2]))
 
-        flipCaps = False
-        if (cardX.length + capSize/100) > dist:
-            flipCaps=True
-            origin = Vector(dimLineEnd) - Vector(cardX/2 + cardX.normalized()*capSize/100) - Vector(cardY/2)
+    #Lines
+    leadStartA = Vector(basePoint) + geoOffsetDistance
+    leadEndA = Vector(basePoint)  + offsetDistance
 
+    leadEndB =  leadEndA - Vector(secondPointAxis)
+    leadStartB = Vector(secondPoint) - viewAxisDiff + geoOffsetDistance
 
-        square = [(origin-(cardX/2)),(origin-(cardX/2)+cardY ),(origin+(cardX/2)+cardY ),(origin+(cardX/2))]
-        
+    viewDiffStartB = leadStartB
+    viewDiffEndB = leadStartB + viewAxisDiff
 
-       # end = time.perf_counter()
-        #print(("calc time: "+ "%.3f"%((end-start)*1000)) + ' ms')  
+    dimLineStart = leadEndA -(offsetDistance.normalized()*0.05)
+    dimLineEnd = leadEndB-(offsetDistance.normalized()*0.05)
+    textLoc = interpolate3d(dimLineStart, dimLineEnd, fabs(dist / 2))
 
-        #start = time.perf_counter()
-        if scene.measureit_arch_gl_show_d:
-            draw_text_3D(context,dim,myobj,square)
-        
-        
+    #format text
+    distanceText = str(format_distance(textFormat,dist))
+    
+    width = dim.textWidth
+    height = dim.textHeight 
+    resolution = dimProps.textResolution
+    size = dimProps.fontSize/fontSizeMult
+    sx = (width/resolution)*0.1*size
+    sy = (height/resolution)*0.1*size
+    origin = Vector(textLoc)
+    cardX = Vector((abs(normDistVector[0]),-abs(normDistVector[1]),-abs(normDistVector[2]))) * sx
+    cardY = userOffsetVector *sy
 
-        #Collect coords and endcaps
-        coords = [leadStartA,leadEndA,leadStartB,leadEndB,dimLineStart,dimLineEnd,viewDiffStartB,viewDiffEndB]
-        filledCoords = []
-        pos = (dimLineStart,dimLineEnd)
-        i=0
-        for cap in caps:
-            capCoords = generate_end_caps(context,dimProps,cap,capSize,pos[i],userOffsetVector,textLoc,i,flipCaps)
-            i += 1 
-            for coord in capCoords[0]:
-                coords.append(coord)
-            for filledCoord in capCoords[1]:
-                filledCoords.append(filledCoord)
+    flipCaps = False
+    if (cardX.length + capSize/100) > dist:
+        flipCaps=True
+        origin = Vector(dimLineEnd) - Vector(cardX/2 + cardX.normalized()*capSize/100) - Vector(cardY/2)
 
-        
-        # Keep this out of the loop to avoid extra draw calls 
-        if len(filledCoords) != 0:
-            #bind shader
-            bgl.glEnable(bgl.GL_POLYGON_SMOOTH)
-            triShader.bind()
-            triShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-            triShader.uniform_float("offset", 0)
-
-            batch = batch_for_shader(triShader, 'TRIS', {"pos": filledCoords})
-            batch.program_set(triShader)
-            batch.draw()
-            gpu.shader.unbind()
-            bgl.glDisable(bgl.GL_POLYGON_SMOOTH)
-        
-        #bind shader
-        lineShader.bind()
-        lineShader.uniform_float("Viewport",viewport)
-        lineShader.uniform_float("thickness",lineWeight)
-        lineShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-        lineShader.uniform_float("offset", 0)
 
-        # batch & Draw Shader   
-        batch = batch_for_shader(lineShader, 'LINES', {"pos": coords})
-        batch.program_set(lineShader)
-        batch.draw()
-        gpu.shader.unbind()
+    square = [(origin-(cardX/2)),(origin-(cardX/2)+cardY ),(origin+(cardX/2)+cardY ),(origin+(cardX/2))]
+    
 
-        #Reset openGL Settings
-        bgl.glEnable(bgl.GL_DEPTH_TEST)
-        bgl.glDepthMask(True)
+    #Collect coords and endcaps
+    coords = [leadStartA,leadEndA,leadStartB,leadEndB,dimLineStart,dimLineEnd,viewDiffStartB,viewDiffEndB]
+    endCaps = []
+    pos = (dimLineStart,dimLineEnd)
+    i=0
+    if lod >= LOD_NO_CAPS:
+        caps = ()
+    for cap in caps:
+        endCap = get_end_cap(dimProps,cap,capSize,pos[i],userOffsetVector,textLoc,i,flipCaps)
+        i += 1 
+        if endCap is not None:
+            endCaps.append(endCap)
+
+    return {
+        'text': distanceText,
+        'gizLoc': midpoint,
+        'gizRotDir': userOffsetVector,
+        'gizRotAxis': alignedDistVector,
+        'square': square,
+        'coords': np.array(coords, dtype=np.float32),
+        'endCaps': endCaps}
 
-        #end = time.perf_counter()
-        #print(("draw time: "+ "%.3f"%((end-start)*1000)) + ' ms')  
 
 def draw_angleDimension(context, myobj, DimGen, dim,mat):
     dimProps = dim
     if dim.uses_style:
-        for alignedDimStyle in context.scene.StyleGenerator[0].alignedDimensions:
-            if alignedDimStyle.name == dim.style:
-                dimProps = alignedDimStyle
+        dimProps = get_style(context.scene, 'alignedDimensions', dim.style, dim)
 
     # Check Visibility Conditions
     inView = False
@@ -687,15 +635,26 @@ def draw_angleDimension(context, myobj, DimGen, dim,mat):
         pr = scene.measureit_arch_gl_precision
         a_code = "\u00b0"  # degree
         fmt = "%1." + str(pr) + "f"
-        obverts = myobj['obverts']
+        obverts = get_obverts(myobj)
         rawRGB = dimProps.color
         rgb = (pow(rawRGB[0],(1/2.2)),pow(rawRGB[1],(1/2.2)),pow(rawRGB[2],(1/2.2)),rawRGB[3])
         radius = dim.dimRadius
         offset = 0.001
 
-        p1 = Vector(get_point(obverts[dim.dimPointA], myobj,mat))
-        p2 = Vector(get_point(obverts[dim.dimPointB], myobj,mat))
-        p3 = Vector(get_point(obverts[dim.dimPointC], myobj,mat))
+        anglePoints = get_points(obverts, [dim.dimPointA, dim.dimPointB, dim.dimPointC], mat)
+
+        # Skip dimensions outside the view
+        if not points_in_view(anglePoints, radius + get_text_reach(dim, dimProps)):
+            return
+
+        # Simplify dimensions that are small on screen
+        lod = get_lod(context.scene, anglePoints[1], radius * 2 + get_text_reach(dim, dimProps))
+        if lod == LOD_HIDDEN:
+            return
+
+        p1 = Vector(anglePoints[0])
+        p2 = Vector(anglePoints[1])
+        p3 = Vector(anglePoints[2])
 
         #calc normal to plane defined by points
         vecA = (p1-p2)
@@ -712,14 +671,8 @@ def draw_angleDimension(context, myobj, DimGen, dim,mat):
         distVector = vecA-vecB
         dist = distVector.length
         angle = vecA.angle(vecB)
-        numCircleVerts = math.ceil(radius/.4)+ int((degrees(angle))/10)
-        verts = []
-        for idx in range (numCircleVerts+1):
-            rotangle= (angle/(numCircleVerts+1))*idx
-            point = Vector((vecA[0],vecA[1],vecA[2]))
-            point.rotate(Quaternion(norm,rotangle))
-            #point.normalize()
-            verts.append(point)
+        numSegments = get_arc_segments(context, p2, endpointA, radius, angle)
+        arcCoords = get_arc_points(p2, vecA, norm, angle, radius, numSegments)
 
 
         #get Midpoint for Text Placement
@@ -754,53 +707,128 @@ def draw_angleDimension(context, myobj, DimGen, dim,mat):
         cardY = midVec *sy
         square = [(origin-(cardX/2)),(origin-(cardX/2)+cardY ),(origin+(cardX/2)+cardY ),(origin+(cardX/2))]
 
-        if scene.measureit_arch_gl_show_d:
-            draw_text_3D(context,dim,myobj,square)
-
+        if scene.measureit_arch_gl_show_d and lod == LOD_FULL:
+            draw_text_3D(context,dim,myobj,square,dimProps)
 
 
-        #configure shaders
-        pointShader.bind()
-        pointShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-        pointShader.uniform_float("thickness", lineWeight)
-        pointShader.uniform_float("offset", -offset)
-        gpu.shader.unbind()
 
-        lineShader.bind()
-        lineShader.uniform_float("Viewport",viewport)
-        lineShader.uniform_float("thickness",lineWeight)
-        lineShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-        lineShader.uniform_float("offset", -offset)
-
-        # Draw Point Pass for Clean Corners
-        # I'm being lazy here, should do a proper lineadjacency
-        # with miters and do this in one pass
-        pointCoords = []
-        pointCoords.append(endpointA)
-        for vert in verts:
-            pointCoords.append((vert*radius)+p2)
-        pointCoords.append(endpointB)
-        batch3d = batch_for_shader(pointShader, 'POINTS', {"pos":pointCoords})
-        batch3d.program_set(pointShader)
-        batch3d.draw()
-
-        # batch & Draw Shader
-        coords = []
-        coords.append(endpointA)
-        for vert in verts:
-            coords.append((vert*radius)+p2)
-            coords.append((vert*radius)+p2)
-        coords.append(endpointB)
+        renderList = get_render_list(context)
 
-        batch = batch_for_shader(lineShader, 'LINES', {"pos": coords})
-        batch.program_set(lineShader)
-        batch.draw()
-        gpu.shader.unbind()
+        # Queue the arc as one mitered polyline
+        renderList.add(get_shader('lineAdj'), 'LINES_ADJ', {
+            "Viewport": viewport,
+            "thickness": lineWeight,
+            "finalColor": rgb,
+            "offset": -offset}, get_polyline_adjacency(arcCoords))
 
         #Reset openGL Settings
         bgl.glDisable(bgl.GL_DEPTH_TEST)
         bgl.glDepthMask(True)
 
+# --------------------------------------------------------------------
+# Direction the viewport or render camera looks from
+# --------------------------------------------------------------------
+def get_view_vector(context):
+    if context.scene.measureit_arch_is_render_draw:
+        return context.scene.camera.location.normalized()
+    viewVec = Vector((0,0,1))
+    viewVec.rotate(context.area.spaces[0].region_3d.view_rotation)
+    return viewVec
+
+
+# --------------------------------------------------------------------
+# Snap a view direction to the closest world axis
+# --------------------------------------------------------------------
+def snap_view_axis(viewAxis):
+    # Use Basic Threshold
+    basicThreshold = 0.5773
+
+    # Set View axis Based on View Sector
+    if viewAxis[0] > basicThreshold or viewAxis[0] < -basicThreshold:
+        viewAxis = Vector((1,0,0))
+    if viewAxis[1] > basicThreshold or viewAxis[1] < -basicThreshold:
+        viewAxis = Vector((0,1,0))
+    if viewAxis[2] > basicThreshold or viewAxis[2] < -basicThreshold:
+        viewAxis = Vector((0,0,1))
+    return viewAxis
+
+
+# --------------------------------------------------------------------
+# Sector of the view space an axis dimension is seen from
+# returns a signed unit axis tuple or None between sectors
+# --------------------------------------------------------------------
+def get_axis_view_sector(viewAxis, axis):
+    if axis =='X':
+        xThreshold = 0.95796
+        yThreshold = 0.22146
+        zThreshold = 0.197568
+    elif axis == 'Y':
+        xThreshold = 0.22146
+        yThreshold = 0.95796
+        zThreshold = 0.197568
+    else:
+        xThreshold = 0.24681
+        yThreshold = 0.24681
+        zThreshold = 0.93800
+
+    viewSector = None
+    if viewAxis[0] > xThreshold:
+        viewSector = (1,0,0)
+    elif viewAxis[0] < -xThreshold:
+        viewSector = (-1,0,0)
+
+    if viewAxis[1] > yThreshold:
+        viewSector = (0,1,0)
+    elif viewAxis[1] < -yThreshold:
+        viewSector = (0,-1,0)
+
+    if viewAxis[2] > zThreshold:
+        viewSector = (0,0,1)
+    elif viewAxis[2] < -zThreshold:
+        viewSector = (0,0,-1)
+    return viewSector
+
+
+# --------------------------------------------------------------------
+# Signature of everything a dimensions resolved geometry depends on
+# Views only matter through the sector they snap to, so orbiting
+# within a sector, hovering and UI redraws reuse the last result
+# axis: the dimAxis of axis dimensions, None for aligned ones
+# --------------------------------------------------------------------
+def get_dim_signature(context, myobj, dim, dimProps, p1, p2, lod, axis=None):
+    scene = context.scene
+    units = scene.unit_settings
+
+    if dim.dimViewPlane=='99':
+        viewPlane = dimProps.dimViewPlane
+    else:
+        viewPlane = dim.dimViewPlane
+
+    viewKey = None
+    if viewPlane == '99':
+        viewAxis = get_view_vector(context)
+        viewKey = tuple(snap_view_axis(viewAxis))
+        if axis is not None:
+            viewKey = (viewKey, get_axis_view_sector(viewAxis, axis))
+    elif axis is not None:
+        viewKey = axis
+
+    objSig = get_geometry_signature(myobj)
+    if dim.dimObjectB is not None and dim.dimObjectB != myobj:
+        objSig = (objSig, get_geometry_signature(dim.dimObjectB))
+
+    return (objSig, tuple(p1), tuple(p2),
+            tuple(tuple(row) for row in myobj.matrix_world),
+            viewPlane, viewKey, lod, dim.as_pointer(), dimProps.as_pointer(),
+            dim.dimRotation, dim.dimOffset, dim.dimLeaderOffset,
+            dim.dimPointA, dim.dimPointB, dim.textWidth, dim.textHeight,
+            dimProps.endcapA, dimProps.endcapB, dimProps.endcapSize,
+            dimProps.endcapArrowAngle, dimProps.textResolution, dimProps.fontSize,
+            scene.measureit_arch_gl_precision, scene.measureit_arch_hide_units,
+            scene.measureit_arch_imperial_precision, units.system,
+            units.length_unit, units.scale_length, units.use_separate)
+
+
 def select_normal(myobj, dim, normDistVector, midpoint, dimProps):
     #Set properties
     context = bpy.context
@@ -826,30 +854,12 @@ def select_normal(myobj, dim, normDistVector, midpoint, dimProps):
         viewAxis = i
 
     if viewPlane == '99':
-        # Get Viewport and CameraLoc or ViewRot
-        if context.scene.measureit_arch_is_render_draw:
-            cameraLoc = context.scene.camera.location.normalized()
-            viewAxis = cameraLoc
-        else:
-            viewRot = context.area.spaces[0].region_3d.view_rotation
-            viewVec = k.copy()
-            viewVec.rotate(viewRot)
-            viewAxis = viewVec
-
-        # Use Basic Threshold
-        basicThreshold = 0.5773
-
         # Set View axis Based on View Sector
-        if viewAxis[0] > basicThreshold or viewAxis[0] < -basicThreshold:
-            viewAxis = i
-        if viewAxis[1] > basicThreshold or viewAxis[1] < -basicThreshold:
-            viewAxis = j
-        if viewAxis[2] > basicThreshold or viewAxis[2] < -basicThreshold:
-            viewAxis = k
+        viewAxis = snap_view_axis(get_view_vector(context))
 
     # Mesh Dimension Behaviour
     if myobj.type == 'MESH':
-        if dim.dimPointA != 9999999:
+        if dim.dimPointA != ORIGIN_INDEX:
             vertA = myobj.data.vertices[dim.dimPointA]
             directionRay = vertA.normal + loc 
         else:
@@ -910,7 +920,8 @@ def select_normal(myobj, dim, normDistVector, midpoint, dimProps):
         
 def draw_line_group(context, myobj, lineGen, mat):
     scene = context.scene
-    obverts = myobj['obverts']
+    obverts = get_obverts(myobj)
+    renderList = get_render_list(context)
     bgl.glEnable(bgl.GL_MULTISAMPLE)
     bgl.glEnable(bgl.GL_BLEND)
     bgl.glEnable(bgl.GL_DEPTH_TEST)
@@ -925,9 +936,7 @@ def draw_line_group(context, myobj, lineGen, mat):
         lineGroup = lineGen.line_groups[idx]
         lineProps= lineGroup
         if lineGroup.uses_style:
-            for lineStyle in context.scene.StyleGenerator[0].line_groups:
-                if lineStyle.name == lineGroup.style:
-                    lineProps= lineStyle
+            lineProps = get_style(context.scene, 'line_groups', lineGroup.style, lineGroup)
             
         if lineGroup.visible and lineProps.visible:
             
@@ -981,97 +990,192 @@ def draw_line_group(context, myobj, lineGen, mat):
                 offset = -10 - offset
             offset /= 1000
 
-            #gl Settings
-            bgl.glDepthFunc(bgl.GL_LEQUAL) 
-
-            #configure Shaders
-            pointShader.bind()
-            pointShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-            pointShader.uniform_float("Viewport",viewport)
-            pointShader.uniform_float("thickness", lineWeight)
-            pointShader.uniform_float("offset", -offset)
-            gpu.shader.unbind()
-
-            lineShader.bind()
-            lineShader.uniform_float("Viewport",viewport)
-            lineShader.uniform_float("thickness",lineWeight)
-            lineShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-            lineShader.uniform_float("offset", -offset)
-           
-            
             #Get line data to be drawn
-            coords =[]
-            pointcoord =[]
-            arclengths = []
-            for x in range(0,lineGroup.numLines):
-                sLine = lineGroup.singleLine[x]
-                
-                if sLine.pointA <= len(obverts) and sLine.pointB <= len(obverts):
-                    a_p1 = get_point(obverts[sLine.pointA], myobj,mat)
-                    b_p1 = get_point(obverts[sLine.pointB], myobj,mat)
-
-                if  a_p1 is not None and b_p1 is not None:
-                    coords.append(a_p1)
-                    pointcoord.append(a_p1)
-                    arclengths.append(0)
-                    
-                    coords.append(b_p1)
-                    arclengths.append((Vector(a_p1)-Vector(b_p1)).length)
-                    
-            #Draw Point Pass for Clean Corners
-            batch3d = batch_for_shader(pointShader, 'POINTS', {"pos": pointcoord})
-            batch3d.program_set(pointShader)
-            batch3d.draw()
+            lineData = get_line_group_data(obverts, myobj, idx, lineGroup, mat)
+            if lineData is None or not box_in_view(*lineData['bounds']):
+                continue
+            signature = lineData['sig']
+
+            # Point pass for the corners the line shaders can't close
+            if lineProps.lineDrawDashed:
+                pointCoords = lineData['points']
+            else:
+                pointCoords = lineData['junctions']
+            if len(pointCoords) != 0:
+                renderList.add(get_shader('point'), 'POINTS', {
+                    "finalColor": rgb,
+                    "Viewport": viewport,
+                    "thickness": lineWeight,
+                    "offset": -offset}, pointCoords, signature=signature)
 
             if drawHidden == True:
-                # Invert The Depth test for hidden lines
-                bgl.glDepthFunc(bgl.GL_GREATER)
+                # Visible and hidden lines in one pass, the shader
+                # tests against a copy of the scene depth itself
                 hiddenLineWeight = lineProps.lineHiddenWeight
                 
                 rawRGB = lineProps.lineHiddenColor
                 #undo blenders Default Gamma Correction
                 dashRGB = (pow(rawRGB[0],(1/2.2)),pow(rawRGB[1],(1/2.2)),pow(rawRGB[2],(1/2.2)),rawRGB[3])
 
-                dashedLineShader.bind()
-                dashedLineShader.uniform_float("u_Scale", lineProps.lineHiddenDashScale)
-                dashedLineShader.uniform_float("Viewport",viewport)
-                dashedLineShader.uniform_float("thickness",hiddenLineWeight)
-                dashedLineShader.uniform_float("screenSpaceDash",lineProps.screenSpaceDashes)
-                dashedLineShader.uniform_float("finalColor", (dashRGB[0], dashRGB[1], dashRGB[2], dashRGB[3]))
-   
-            
-                batchHidden = batch_for_shader(dashedLineShader,'LINES',{"pos":coords,"arcLength":arclengths}) 
-                batchHidden.program_set(dashedLineShader)
-                batchHidden.draw()
-                bgl.glDepthFunc(bgl.GL_LESS)
-                gpu.shader.unbind()
-            
-            # Draw Lines
-            if lineProps.lineDrawDashed:
-                dashedLineShader.bind()
-                dashedLineShader.uniform_float("u_Scale", lineProps.lineHiddenDashScale)
-                dashedLineShader.uniform_float("Viewport",viewport)
-                dashedLineShader.uniform_float("thickness",lineWeight)
-                dashedLineShader.uniform_float("screenSpaceDash",lineProps.screenSpaceDashes)
-                dashedLineShader.uniform_float("finalColor",  (rgb[0], rgb[1], rgb[2], rgb[3]))
-               
-            
-                batchHidden = batch_for_shader(dashedLineShader,'LINES',{"pos":coords,"arcLength":arclengths}) 
-                batchHidden.program_set(dashedLineShader)
-                batchHidden.draw()
+                renderList.add(get_shader('hiddenLine'), 'LINES_ADJ', {
+                    "u_Scale": lineProps.lineHiddenDashScale,
+                    "Viewport": viewport,
+                    "thickness": lineWeight,
+                    "hiddenThickness": hiddenLineWeight,
+                    "screenSpaceDash": lineProps.screenSpaceDashes,
+                    "dashVisible": lineProps.lineDrawDashed,
+                    "finalColor": rgb,
+                    "hiddenColor": dashRGB,
+                    "offset": -offset}, lineData['adjacency'], lineData['adjArcLengths'],
+                    signature=signature, depthFunc=bgl.GL_ALWAYS, texture=DEPTH_TEXTURE)
+
+            # Queue Lines
+            elif lineProps.lineDrawDashed:
+                renderList.add(get_shader('dashedLine'), 'LINES', {
+                    "u_Scale": lineProps.lineHiddenDashScale,
+                    "Viewport": viewport,
+                    "thickness": lineWeight,
+                    "screenSpaceDash": lineProps.screenSpaceDashes,
+                    "finalColor": rgb}, lineData['coords'], lineData['arcLengths'],
+                    signature=signature)
 
             else:
-                batch3d = batch_for_shader(lineShader, 'LINES', {"pos": coords})
-                batch3d.program_set(lineShader)
-                batch3d.draw()
-                gpu.shader.unbind()
+                # Joints of two lines are mitered, only joints where
+                # more lines meet need a point to fill the gaps
+                renderList.add(get_shader('lineAdj'), 'LINES_ADJ', {
+                    "Viewport": viewport,
+                    "thickness": lineWeight,
+                    "finalColor": rgb,
+                    "offset": -offset}, lineData['adjacency'], signature=signature)
             
-    gpu.shader.unbind()
     bgl.glDisable(bgl.GL_DEPTH_TEST)
     bgl.glDepthMask(True)
 
+# --------------------------------------------------------------------
+# Get world space line data for a line group
+# returns the interleaved A,B segment coords, the A points,
+# the arc length at each segment vertex, the LINES_ADJ coords and
+# arc lengths and the points where more than two lines meet
+# --------------------------------------------------------------------
+def get_line_group_coords(obverts, lineGroup, mat):
+    numLines = len(lineGroup.singleLine)
+    pointsA = np.empty(numLines, dtype=np.int32)
+    pointsB = np.empty(numLines, dtype=np.int32)
+    lineGroup.singleLine.foreach_get('pointA', pointsA)
+    lineGroup.singleLine.foreach_get('pointB', pointsB)
+
+    # skip lines pointing past the end of the mesh
+    valid = (pointsA >= 0) & (pointsA < len(obverts)) & (pointsB >= 0) & (pointsB < len(obverts))
+    segments = np.column_stack((pointsA[valid], pointsB[valid]))
+    adjacency, junctions = get_line_adjacency(segments)
+
+    adjCoords = get_points(obverts, adjacency.ravel(), mat)
+    coords = adjCoords.reshape((-1, 4, 3))[:, 1:3].reshape((-1, 3))
+    pointcoord = np.ascontiguousarray(coords[0::2])
+    segLengths = np.linalg.norm(coords[0::2] - coords[1::2], axis=1)
+    arclengths = np.column_stack((np.zeros(len(segLengths)), segLengths)).ravel()
+    adjArclengths = np.column_stack((np.zeros(len(segLengths)), np.zeros(len(segLengths)),
+                                     segLengths, segLengths)).ravel()
+    junctionCoords = get_points(obverts, junctions, mat)
+
+    return (coords.astype(np.float32), pointcoord.astype(np.float32), arclengths.astype(np.float32),
+            adjCoords.astype(np.float32), adjArclengths.astype(np.float32), junctionCoords.astype(np.float32))
+
+# --------------------------------------------------------------------
+# Adjacency of line segments for LINES_ADJ batches
+# segments: (N,2) vertex indices
+# returns the (N,4) previous, start, end and next vertex of every
+# segment and the vertices shared by more than two segments.
+# Only joints of exactly two segments get a neighbour, other ends
+# repeat their own vertex
+# --------------------------------------------------------------------
+def get_line_adjacency(segments):
+    numSegs = len(segments)
+    ends = np.concatenate((segments[:, 0], segments[:, 1]))
+    others = np.concatenate((segments[:, 1], segments[:, 0]))
+
+    order = np.argsort(ends, kind='stable')
+    uniqueEnds, starts, counts = np.unique(ends[order], return_index=True, return_counts=True)
+    groups = np.searchsorted(uniqueEnds, ends)
+    isJoint = counts[groups] == 2
+
+    # the partner of an end at a joint is the other end in its group
+    rank = np.empty(len(ends), dtype=np.int64)
+    rank[order] = np.arange(len(ends))
+    partnerRank = np.where(isJoint, 2 * starts[groups] + 1 - rank, rank)
+    neighbours = np.where(isJoint, others[order[partnerRank]], ends)
+
+    adjacency = np.column_stack((neighbours[:numSegs], segments[:, 0], segments[:, 1], neighbours[numSegs:]))
+    return adjacency, uniqueEnds[counts > 2]
+
+# --------------------------------------------------------------------
+# LINES_ADJ coords of an open polyline
+# --------------------------------------------------------------------
+def get_polyline_adjacency(points):
+    points = np.asarray(points, dtype=np.float32).reshape((-1, 3))
+    numSegs = len(points) - 1
+    if numSegs < 1:
+        return np.empty((0, 3), dtype=np.float32)
+    padded = np.concatenate((points[:1], points, points[-1:]))
+    adjacency = np.stack((padded[0:numSegs], padded[1:numSegs + 1],
+                          padded[2:numSegs + 2], padded[3:numSegs + 3]), axis=1)
+    return adjacency.reshape((-1, 3))
+
+# --------------------------------------------------------------------
+# Get the cached world space line data for a line group
+# Rebuilt only when the vertices, the world matrix, the lines in the
+# group or a flagged property changed, returns None for empty groups
+# --------------------------------------------------------------------
+def get_line_group_data(obverts, myobj, idx, lineGroup, mat):
+    matKey = tuple(tuple(row) for row in mat)
+    itemKey = ('line_group', idx, matKey)
+    signature = get_geometry_signature(myobj) + (len(lineGroup.singleLine),)
+
+    lineData = get_cached_data(myobj, itemKey, signature)
+    if lineData is None:
+        coords, pointcoord, arclengths, adjacency, adjArclengths, junctions = \
+            get_line_group_coords(obverts, lineGroup, mat)
+        lineData = {
+            'coords': coords,
+            'points': pointcoord,
+            'arcLengths': arclengths,
+            'adjacency': adjacency,
+            'adjArcLengths': adjArclengths,
+            'junctions': junctions,
+            'bounds': (coords.min(axis=0), coords.max(axis=0)) if len(coords) != 0 else None,
+            'sig': (myobj.name, itemKey, signature)
+        }
+        set_cached_data(myobj, itemKey, signature, lineData)
+
+    if len(lineData['coords']) == 0:
+        return None
+    return lineData
+
+# --------------------------------------------------------------------
+# How far an items text card can reach past its anchor, in world units
+# --------------------------------------------------------------------
+def get_text_reach(textobj, props):
+    resolution = props.textResolution
+    if resolution == 0:
+        return 0
+    size = props.fontSize/fontSizeMult
+    width = textobj.textWidth
+    height = textobj.textHeight
+    # Not measured yet, assume a single character so new labels
+    # are not culled or simplified before their first measure
+    if width == 0 and height == 0:
+        width = height = math.ceil(20 * resolution / 72)
+    return ((width + height)/resolution)*0.1*size
+
+# --------------------------------------------------------------------
+# How far a dimension can reach past its two points, in world units
+# --------------------------------------------------------------------
+def get_dim_reach(dim, dimProps):
+    capReach = dimProps.endcapSize/50
+    return abs(dim.dimOffset) + abs(dim.dimLeaderOffset) + capReach + get_text_reach(dim, dimProps)
+
 def draw_annotation(context, myobj, annotationGen, mat):
-    obverts = myobj['obverts']
+    obverts = get_obverts(myobj)
     scene = context.scene
     bgl.glEnable(bgl.GL_MULTISAMPLE)
     bgl.glEnable(bgl.GL_BLEND)
@@ -1089,9 +1193,7 @@ def draw_annotation(context, myobj, annotationGen, mat):
         annotationProps = annotation
         
         if annotation.uses_style:
-            for annotationStyle in context.scene.StyleGenerator[0].annotations:
-                if annotationStyle.name == annotation.style:
-                    annotationProps= annotationStyle
+            annotationProps = get_style(context.scene, 'annotations', annotation.style, annotation)
 
         endcap = annotationProps.endcapA
         endcapSize = annotationProps.endcapSize
@@ -1101,26 +1203,31 @@ def draw_annotation(context, myobj, annotationGen, mat):
             rawRGB = annotationProps.color
             #undo blenders Default Gamma Correction
             rgb = (pow(rawRGB[0],(1/2.2)),pow(rawRGB[1],(1/2.2)),pow(rawRGB[2],(1/2.2)),rawRGB[3])
-
-            pointShader.bind()
-            pointShader.uniform_float("Viewport",viewport)
-            pointShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-            pointShader.uniform_float("thickness", lineWeight)
-            pointShader.uniform_float("offset", 0)
-            gpu.shader.unbind()
-
-            lineShader.bind()
-            lineShader.uniform_float("Viewport",viewport)
-            lineShader.uniform_float("thickness",lineWeight)
-            lineShader.uniform_float("offset", 0)
-            lineShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
+            renderList = get_render_list(context)
 
             # Get Points
             if annotation.annotationAnchorObject.type == 'MESH':
-                p1 = get_point(obverts[annotation.annotationAnchor], myobj,mat)
+                p1 = Vector(get_points(obverts, [annotation.annotationAnchor], mat)[0])
             else:
                 p1 = mat @ Vector((0,0,0))
 
+            # Skip annotations outside the view
+            reach = Vector(annotation.annotationOffset).length + get_text_reach(annotation, annotationProps)
+            if not points_in_view([p1], reach):
+                continue
+
+            # Far away annotations are only drawn as a dot
+            lod = get_lod(scene, p1, reach)
+            if lod == LOD_HIDDEN:
+                renderList.add(get_shader('point'), 'POINTS', {
+                    "Viewport": viewport,
+                    "finalColor": rgb,
+                    "thickness": lineWeight * 2,
+                    "offset": 0}, [p1])
+                continue
+            if lod >= LOD_NO_CAPS:
+                endcap = None
+
             loc = mat.to_translation()
             diff = Vector(p1) - Vector(loc)
             offset = annotation.annotationOffset
@@ -1162,71 +1269,102 @@ def draw_annotation(context, myobj, annotationGen, mat):
 
                 coords.append(lineEnd)
                 coords.append(p2)
-                coords.append(p2)
                 if annotation.textPosition == 'T':
                     coords.append(textcard[3])
-                    pointcoords = [p2]
                 elif annotation.textPosition == 'B':
                     coords.append(textcard[2])
-                    pointcoords = [p2]
 
-                batch3d = batch_for_shader(lineShader, 'LINES', {"pos": coords})
-                batch3d.program_set(lineShader)
-                batch3d.draw()
-                gpu.shader.unbind()
-                
-                # Again This is Super Lazy, gotta write up a shader that handles
-                # Mitered thick lines, but for now this works.
-                if annotation.textPosition == 'T' or annotation.textPosition == 'B':
-                    batch3d = batch_for_shader(pointShader, 'POINTS', {"pos": pointcoords})
-                    batch3d.program_set(pointShader)
-                    batch3d.draw()
+                # Leader and text underline as one mitered polyline
+                renderList.add(get_shader('lineAdj'), 'LINES_ADJ', {
+                    "Viewport": viewport,
+                    "thickness": lineWeight,
+                    "offset": 0,
+                    "finalColor": rgb}, get_polyline_adjacency(coords))
             
-            # Draw Line Endcaps
+            # Queue Line Endcaps
             if endcap == 'D':
-                pointShader.bind()
-                pointShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-                pointShader.uniform_float("thickness", endcapSize)
-                pointShader.uniform_float("offset", -0.01)
-                gpu.shader.unbind()
-                
                 pointcoords = [p1]
-                batch3d = batch_for_shader(pointShader, 'POINTS', {"pos": pointcoords})
-                batch3d.program_set(pointShader)
-                batch3d.draw()
+                renderList.add(get_shader('point'), 'POINTS', {
+                    "Viewport": viewport,
+                    "finalColor": rgb,
+                    "thickness": endcapSize,
+                    "offset": -0.01}, pointcoords)
             
             if endcap == 'T':
-                axis = Vector(p1) - Vector(p2)
-                line = interpolate3d(Vector((0,0,0)), axis, -0.1)
-                line = Vector(line) * endcapSize/10
-                perp = line.orthogonal()
-                rotangle = annotationProps.endcapArrowAngle-radians(5)
-                line.rotate(Quaternion(perp,rotangle))
-                coords = []
-                for idx in range (12):
-                    rotangle = radians(360/12)
-                    coords.append(line.copy() + Vector(p1))
-                    coords.append(Vector((0,0,0)) + Vector(p1))
-                    line.rotate(Quaternion(axis,rotangle))
-                    coords.append(line.copy() + Vector(p1))
-
-                bgl.glEnable(bgl.GL_POLYGON_SMOOTH)
-                triShader.bind()
-                triShader.uniform_float("finalColor", (rgb[0], rgb[1], rgb[2], rgb[3]))
-                triShader.uniform_float("offset", (0,0,0))
-
-                batch = batch_for_shader(triShader, 'TRIS', {"pos": coords})
-                batch.program_set(triShader)
-                batch.draw()
-                gpu.shader.unbind()
-                bgl.glDisable(bgl.GL_POLYGON_SMOOTH)
-
-            if scene.measureit_arch_gl_show_d:
-                draw_text_3D(context,annotation,myobj,textcard)                
+                axis = (Vector(p1) - Vector(p2)).normalized()
+                coneCap = (p1, axis, (0,0,0), (0,0,0),
+                           (CONE_CAP, endcapSize, annotationProps.endcapArrowAngle, 0))
+                queue_end_caps(context, [coneCap], rgb, lineWeight, viewport)
+
+            if scene.measureit_arch_gl_show_d and lod == LOD_FULL:
+                draw_text_3D(context,annotation,myobj,textcard,annotationProps)                
 
     bgl.glDisable(bgl.GL_DEPTH_TEST)
     bgl.glDepthMask(True)
 
+# Sample fractions of an arc by segment count
+_arc_tables = {}
+
+# Limits of the segments used for an arc
+MIN_ARC_SEGMENTS = 4
+MAX_ARC_SEGMENTS = 128
+
+# Length in pixels of one arc segment on screen
+ARC_SEGMENT_PIXELS = 6
+
+# --------------------------------------------------------------------
+# Get the table of sample fractions for an arc of n segments
+# --------------------------------------------------------------------
+def get_arc_table(segments):
+    table = _arc_tables.get(segments)
+    if table is None:
+        table = np.linspace(0, 1, segments + 1, dtype=np.float32)
+        _arc_tables[segments] = table
+    return table
+
+# --------------------------------------------------------------------
+# Number of segments for an arc so it stays smooth at its size
+# on screen, renders use the size of the arc in world space
+# --------------------------------------------------------------------
+def get_arc_segments(context, center, startPoint, radius, angle):
+    region = context.region
+    rv3d = context.region_data
+    screenRadius = None
+    if not context.scene.measureit_arch_is_render_draw and region is not None and rv3d is not None:
+        screenCenter = view3d_utils.location_3d_to_region_2d(region, rv3d, center)
+        screenStart = view3d_utils.location_3d_to_region_2d(region, rv3d, startPoint)
+        if screenCenter is not None and screenStart is not None:
+            screenRadius = (screenStart - screenCenter).length
+
+    if screenRadius is None:
+        segments = math.ceil(radius/.4)+ int((degrees(angle))/10) + 1
+    else:
+        segments = math.ceil(screenRadius * angle / ARC_SEGMENT_PIXELS)
+    return max(MIN_ARC_SEGMENTS, min(MAX_ARC_SEGMENTS, segments))
+
+# --------------------------------------------------------------------
+# Get the points of an arc
+# center: center of the arc
+# startVec: direction from the center to the start of the arc
+# normal: axis the arc turns around
+# returns (segments + 1, 3) points from the start to the end
+# --------------------------------------------------------------------
+def get_arc_points(center, startVec, normal, angle, radius, segments):
+    u = np.array(startVec, dtype=np.float32)
+    w = np.array(normal, dtype=np.float32)
+    center = np.array(center, dtype=np.float32)
+    u /= np.linalg.norm(u)
+    wLength = np.linalg.norm(w)
+    if wLength == 0:
+        # No plane to turn in, draw straight to the end point
+        return np.array((center + u * radius, center + u * radius * np.cos(angle)), dtype=np.float32)
+    w /= wLength
+    v = np.cross(w, u)
+
+    theta = get_arc_table(segments) * angle
+    points = np.cos(theta)[:, None] * u + np.sin(theta)[:, None] * v
+    return (points * radius + center).astype(np.float32)
+
 def draw_arc(basis,init_angle,current_angle):
     i = Vector((1,0,0))
     k = Vector((0,0,1))
@@ -1240,19 +1378,21 @@ def draw_arc(basis,init_angle,current_angle):
     angle = init_angle - current_angle
     radius = 1
 
-    numCircleVerts = math.ceil(radius/.4)+ int((degrees(angle))/10)
-    verts = []
-    verts.append(Vector((0,0,0)))
-    for idx in range (numCircleVerts+1):
-        rotangle= (angle/(numCircleVerts+1))*idx
-        point = arcStart.copy()
-        point.rotate(Quaternion(k,rotangle))
-        point = basis @ point
-        verts.append(Vector((0,0,0)))
-        verts.append(point)
-        
+    numSegments = max(2, math.ceil(radius/.4)+ int(abs(degrees(angle))/10) + 1)
+    arcPoints = get_arc_points((0,0,0), arcStart, k, angle, radius, numSegments)
+    m4 = np.array(basis.to_4x4(), dtype=np.float32)
+    arcPoints = arcPoints @ m4[:3, :3].T + m4[:3, 3]
+
+    # Fan of triangles from the center
+    numTris = len(arcPoints) - 1
+    verts = np.zeros((numTris, 3, 3), dtype=np.float32)
+    verts[:, 1] = arcPoints[:-1]
+    verts[:, 2] = arcPoints[1:]
+    verts = verts.reshape((-1, 3))
+
 
     bgl.glEnable(bgl.GL_POLYGON_SMOOTH)
+    triShader = get_shader('tri')
     triShader.bind()
     triShader.uniform_float("finalColor", (1, 1, 1, 1))
     triShader.uniform_float("offset", 0)
@@ -1263,7 +1403,9 @@ def draw_arc(basis,init_angle,current_angle):
     gpu.shader.unbind()
     bgl.glDisable(bgl.GL_POLYGON_SMOOTH)
 
-def draw_text_3D(context,textobj,myobj,card):
+def draw_text_3D(context,textobj,myobj,card,props=None):
+    mark_text_drawn(textobj)
+
     #get props
     normalizedDeviceUVs= [(-1,-1),(-1,1),(1,1),(1,-1)]
 
@@ -1348,6 +1490,7 @@ def draw_text_3D(context,textobj,myobj,card):
     autoflipdebug = scene.measureit_arch_debug_flip_text
     if autoflipdebug == True:
         viewport = [context.area.width,context.area.height]
+        lineShader = get_shader('line')
         lineShader.bind()
         lineShader.uniform_float("Viewport",viewport)
         lineShader.uniform_float("thickness",4)
@@ -1385,108 +1528,118 @@ def draw_text_3D(context,textobj,myobj,card):
         uv = (Vector(normUV) + Vector((1,1)))*0.5
         uvs.append(uv)
 
-    # Batch Geometry
-    batch = batch_for_shader(
-        textShader, 'TRI_FAN',
-        {
-            "pos": card,
-            "uv": uvs,
-        },
-    )
+    if props is None:
+        props = textobj
 
-    # Gets Texture from Object
-    width = textobj.textWidth
-    height = textobj.textHeight 
-    dim = width * height * 4
-
-    if 'texture' in textobj:
-        # np.asarray takes advantage of the buffer protocol and solves the bottleneck here!!!
-        buffer = bgl.Buffer(bgl.GL_BYTE, dim, np.asarray(textobj['texture'], dtype=np.uint8))
-        bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA, width, height, 0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, buffer)
-        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
-        textobj.texture_updated=False
-     
-    # Draw Shader
-    textShader.bind()
-    textShader.uniform_float("image", 0)
-    batch.draw(textShader)
-    #bgl.glDeleteTextures(1, texBuf)
-    gpu.shader.unbind()
+    if context.scene.measureit_arch_sdf_text:
+        draw_sdf_text(context,textobj,props,card,uvs)
+        return
+
+    if context.scene.measureit_arch_is_render_draw:
+        _render_text.append((textobj, props, card, uvs))
+        return
+
+    # Gets the atlas region, only uploaded when the text changed
+    region = get_text_region(textobj)
+    if region is None:
+        # Not rasterized yet, hold its place with a faint card
+        if textobj.text_updated:
+            rawRGB = props.color
+            placeholderColor = (rawRGB[0], rawRGB[1], rawRGB[2], rawRGB[3] * 0.15)
+            renderList = get_render_list(context)
+            renderList.add(get_shader('tri'), 'TRIS', {
+                "finalColor": placeholderColor,
+                "offset": 0}, [card[0], card[1], card[2], card[0], card[2], card[3]])
+        return
+
+    # Queue the card, all cards are drawn together by draw_text_queue
+    queue_text(card, uvs, region)
+
+# --------------------------------------------------------------------
+# Queue the text of an item as SDF glyph quads on its card
+# The glyphs are merged with all other text of the same color
+# --------------------------------------------------------------------
+def draw_sdf_text(context,textobj,props,card,uvs):
+    if len(textobj.textField) > 0:
+        lines = [textField.text for textField in textobj.textField if textField.text != ""]
+    else:
+        lines = [str(textobj.text)]
+
+    atlas = get_glyph_atlas(get_props_font_id(props))
+    quads = get_text_quads(textobj, atlas, lines)
+    if quads is None:
+        return
+    pos, glyphUVs = quads
+
+    rawRGB = props.color
+    rgb = (pow(rawRGB[0],(1/2.2)),pow(rawRGB[1],(1/2.2)),pow(rawRGB[2],(1/2.2)),rawRGB[3])
+
+    renderList = get_render_list(context)
+    renderList.add(get_shader('sdfText'), 'TRIS', {
+        "finalColor": rgb,
+        "image": 0}, map_to_card(pos, card, uvs), uv=glyphUVs, texture=atlas.texture)
+
+# --------------------------------------------------------------------
+# Draw all queued text cards in one call per atlas page
+# --------------------------------------------------------------------
+def draw_text_queue():
+    flush_text(get_shader('text'))
+
+# --------------------------------------------------------------------
+# Update the text of the labels the render drew and queue their cards
+# Called once the 3D pass marked every label in the camera view
+# --------------------------------------------------------------------
+def queue_render_text(context):
+    for textobj, props, card, uvs in _render_text:
+        update_text(textobj, props, context)
+    rasterize_text_queue(context, budgetMs=None)
+
+    for textobj, props, card, uvs in _render_text:
+        region = get_text_region(textobj)
+        if region is not None:
+            queue_text(card, uvs, region)
+    _render_text.clear()
+
+# Cap type codes of End_Cap_Shader_3D
+END_CAP_TYPES = {'L': 1, 'T': 2, 'D': 3}
+CONE_CAP = 4
+
+# --------------------------------------------------------------------
+# Get the attributes of an endcap for End_Cap_Shader_3D
+# returns (pos, capDir, capNormal, capUp, capParams)
+# or None when the cap type draws nothing
+# --------------------------------------------------------------------
+def get_end_cap(item,capType,capSize,pos,userOffsetVector,midpoint,posflag,flipCaps):
+    capCode = END_CAP_TYPES.get(capType)
+    if capCode is None:
+        return None
 
-def generate_end_caps(context,item,capType,capSize,pos,userOffsetVector,midpoint,posflag,flipCaps):
-    capCoords = []
-    filledCoords = []
-    size = capSize/100
     distVector = Vector(pos-Vector(midpoint)).normalized()
     norm = distVector.cross(userOffsetVector)
-    line = distVector*size
     arrowAngle = item.endcapArrowAngle
 
     if flipCaps:
         arrowAngle += radians(180)
-    
-    if capType == 99:
-        pass
-    
-    #Line and Triangle Geometry
-    elif capType == 'L' or capType == 'T' :
-        rotangle = arrowAngle
-        line.rotate(Quaternion(norm,rotangle))
-        p1 = (pos - line)
-        p2 = (pos)
-        line.rotate(Quaternion(norm,-(rotangle*2)))
-        p3 = (pos - line)
-        
-        if capType == 'T':
-            filledCoords.append(p1)
-            filledCoords.append(p2)
-            filledCoords.append(p3)
-
-        if capType == 'L':
-            capCoords.append(p1)
-            capCoords.append(p2)
-            capCoords.append(p3)
-            capCoords.append(p2)
-
-    #Dashed Endcap Geometry
-    elif capType == 'D':
-        rotangle = radians(-90)
-        line = userOffsetVector.copy()
-        line *= 1/20
-        line.rotate(Quaternion(norm,rotangle))
-        p1 = (pos - line)
-        p2 = (pos + line)
-
-        # Define Overextension
-        capCoords.append(pos)
-        capCoords.append(line + pos)  
-
-        # Define Square
-        x = distVector.normalized() * capSize/20
-        y = userOffsetVector.normalized() * capSize/20
-        a = 0.055
-        b = 0.085
-       
-        s1 = (a*x) + (b*y)
-        s2 = (b*x) + (a*y)
-        s3 = (-a*x) + (-b*y)
-        s4 = (-b*x) + (-a*y)
-
-        square = (s1,s2,s3,s4)
-
-        for s in square:
-            if posflag < 1:
-                s.rotate(Quaternion(norm,rotangle))
-            s += pos
-
-        filledCoords.append(square[0])
-        filledCoords.append(square[1])
-        filledCoords.append(square[2])
-        filledCoords.append(square[0])
-        filledCoords.append(square[2])
-        filledCoords.append(square[3]) 
-    
-    return capCoords, filledCoords
+
+    return (pos, distVector, norm, userOffsetVector, (capCode, capSize, arrowAngle, posflag))
+
+# --------------------------------------------------------------------
+# Queue endcaps as one point each, the shader builds their geometry
+# --------------------------------------------------------------------
+def queue_end_caps(context, endCaps, rgb, lineWeight, viewport, signature=None):
+    if len(endCaps) == 0:
+        return
+
+    pos, capDir, capNormal, capUp, capParams = zip(*endCaps)
+    renderList = get_render_list(context)
+    renderList.add(get_shader('endCap'), 'POINTS', {
+        "Viewport": viewport,
+        "thickness": lineWeight,
+        "finalColor": rgb}, pos, attributes={
+            "capDir": capDir,
+            "capNormal": capNormal,
+            "capUp": capUp,
+            "capParams": capParams}, signature=signature)
 
 def generate_text_card(context,textobj,textProps,rotation,basePoint): 
     width = textobj.textWidth
@@ -1700,6 +1853,7 @@ def draw_line(v1, v2):
 
 
         coords = [v1,v2]
+        shader = get_shader('base2D')
         batch = batch_for_shader(shader, 'LINE_STRIP', {"pos": coords})
         #rgb = bpy.context.scene.measureit_arch_default_color
         batch.program_set(shader)
@@ -1812,6 +1966,20 @@ def get_point(v1, mainobject, mat):
     return v2
 
 
+# --------------------------------------------------------------------
+# Get points rotated and relative to parent
+# Transforms a whole array of vertex indices with a single matmul
+# obverts: vertex data
+# indices: vertex indices
+# mat: world matrix
+# returns an (N,3) float32 array
+# --------------------------------------------------------------------
+def get_points(obverts, indices, mat):
+    coords = obverts.take(indices)
+    m4 = np.array(mat, dtype=np.float32)
+    return coords @ m4[:3, :3].T + m4[:3, 3]
+
+
 # --------------------------------------------------------------------
 # Get location in world space
 # v1: point
@@ -37,6 +37,7 @@ from bpy.app.handlers import persistent
 from .measureit_arch_geometry import *
 from .measureit_arch_render import *
 from .measureit_arch_main import get_smart_selected, get_selected_vertex
+from .measureit_arch_cache import invalidate_referenced
 from .measureit_arch_baseclass import BaseProp
 
 class SingleLineProperties(PropertyGroup):
@@ -172,7 +173,7 @@ class AddLineButton(Operator):
                     lGroup.numLines +=1
 
                 lineGen.line_num += 1
-
+                invalidate_referenced(mainobject)
 
                 # redraw
                 context.area.tag_redraw()
@@ -383,6 +384,7 @@ class AddToLineGroup(Operator):
 
                                 # redraw
                                 context.area.tag_redraw()
+                        invalidate_referenced(mainobject)
                         return {'FINISHED'}
 
 class AddLineByProperty(Operator):   
@@ -468,6 +470,7 @@ class AddLineByProperty(Operator):
                             lGroup.numLines +=1
 
                         lineGen.line_num += 1
+                        invalidate_referenced(obj)
 
                     return {'FINISHED'}
     
@@ -541,6 +544,7 @@ class RemoveFromLineGroup(Operator):
                                     lGroup.singleLine.remove(idx) 
                                     lGroup.numLines -= 1     
                             idx +=1
+                        invalidate_referenced(mainobject)
   
                         # redraw
                         context.area.tag_redraw()
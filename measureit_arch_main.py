@@ -35,7 +35,12 @@ from bpy.types import PropertyGroup, Panel, Object, Operator, SpaceView3D
 from bpy.props import IntProperty, CollectionProperty, FloatVectorProperty, BoolProperty, StringProperty, \
                       FloatProperty, EnumProperty
 from bpy.app.handlers import persistent
-from .measureit_arch_geometry import draw_annotation, draw_alignedDimension, draw_line_group, draw_angleDimension, update_text, draw_axisDimension
+from .measureit_arch_renderlist import get_render_list
+from .measureit_arch_geometry import draw_annotation, draw_alignedDimension, draw_line_group, draw_angleDimension, update_text, draw_axisDimension, \
+                draw_text_queue
+from .measureit_arch_cache import get_mesh_vertices, check_mods, get_style
+from .measureit_arch_textures import rasterize_text_queue, begin_text_pass
+from .measureit_arch_culling import set_view_frustum
 
 # ------------------------------------------------------
 # Handler to detect new Blend load
@@ -46,6 +51,23 @@ from .measureit_arch_geometry import draw_annotation, draw_alignedDimension, dra
 def load_handler(dummy):
     ShowHideViewportButton.handle_remove(None, bpy.context)
 
+    # Vertex data used to be stashed on the object as an ID property,
+    # drop it from older files now that it lives in the vertex cache
+    for obj in bpy.data.objects:
+        if 'obverts' in obj:
+            del obj['obverts']
+
+        # Same for the rasterized text that lives in the pixel store now
+        textItems = []
+        if 'DimensionGenerator' in obj:
+            dimGen = obj.DimensionGenerator[0]
+            textItems += list(dimGen.alignedDimensions) + list(dimGen.angleDimensions) + list(dimGen.axisDimensions)
+        if 'AnnotationGenerator' in obj:
+            textItems += list(obj.AnnotationGenerator[0].annotations)
+        for textobj in textItems:
+            if 'texture' in textobj:
+                del textobj['texture']
+
 
 # ------------------------------------------------------
 # Handler to detect save Blend
@@ -296,10 +318,19 @@ class SCENE_PT_MARCH_Settings(Panel):
         col = layout.column()
         col.prop(scene, "measureit_arch_gl_show_d")
         col.prop(scene, "measureit_arch_debug_text")
+        col.prop(scene, "measureit_arch_sdf_text")
         col.prop(scene, "measureit_arch_eval_mods")
         col.prop(scene, "measureit_arch_inst_dims")
         col.prop(scene, "measureit_arch_debug_flip_text")
 
+        col = layout.column(align=True)
+        col.prop(scene, "measureit_arch_lod")
+        sub = col.column(align=True)
+        sub.active = scene.measureit_arch_lod
+        sub.prop(scene, "measureit_arch_lod_text")
+        sub.prop(scene, "measureit_arch_lod_caps")
+        sub.prop(scene, "measureit_arch_lod_hide")
+
         # Measureit-ARCH Legacy Overrides
         # Overrides need to be re-implimented in the new version
 
@@ -391,53 +422,6 @@ class ShowHideViewportButton(Operator):
         return {'CANCELLED'}
 
 
-# --------------------------------------------------------------------
-# Get vertex data
-# mainobject
-# --------------------------------------------------------------------
-def get_mesh_vertices(myobj):
-    try:
-        obverts = []
-        verts=[]
-        if myobj.type == 'MESH':
-            if myobj.mode == 'EDIT':
-                bm = bmesh.from_edit_mesh(myobj.data)
-                verts = bm.verts
-            else:
-                eval_res = bpy.context.scene.measureit_arch_eval_mods
-                if eval_res or check_mods(myobj):
-                    deps = bpy.context.view_layer.depsgraph
-                    obj_eval = myobj.evaluated_get(deps)
-                    mesh = obj_eval.to_mesh(preserve_all_data_layers=True, depsgraph=deps)
-                    verts = mesh.vertices
-                else:
-                    verts = myobj.data.vertices
-            for vert in verts:
-                obverts.append(vert.co)
-            return obverts
-        else: return None 
-    except AttributeError:
-        return None
-
-def check_mods(myobj):
-    goodMods = ["DATA_TRANSFER ", "NORMAL_EDIT", "WEIGHTED_NORMAL",
-                'UV_PROJECT', 'UV_WARP', 'ARRAY', 'DECIMATE', 
-                'EDGE_SPLIT', 'MASK', 'MIRROR', 'MULTIRES', 'SCREW',
-                'SOLIDIFY', 'SUBSURF', 'TRIANGULATE', 'ARMATURE', 
-                'CAST', 'CURVE', 'DISPLACE', 'HOOK', 'LAPLACIANDEFORM',
-                'LATTICE', 'MESH_DEFORM', 'SHRINKWRAP', 'SIMPLE_DEFORM',
-                'SMOOTH', 'CORRECTIVE_SMOOTH', 'LAPLACIANSMOOTH',
-                'SURFACE_DEFORM', 'WARP', 'WAVE', 'CLOTH', 'COLLISION', 
-                'DYNAMIC_PAINT', 'PARTICLE_INSTANCE', 'PARTICLE_SYSTEM',
-                'SMOKE', 'SOFT_BODY', 'SURFACE','SOLIDIFY']
-    if myobj.modifiers == None:
-        return False
-    for mod in myobj.modifiers:
-        if mod.type not in goodMods:
-            return False
-    return True
-
-
 # -------------------------------------------------------------
 # Handle all 2d draw routines (Text Updating mostly)
 # -------------------------------------------------------------
@@ -485,26 +469,20 @@ def draw_main(context):
                     
                     alignedDimProps = alignedDim
                     if alignedDim.uses_style:
-                        for alignedDimStyle in context.scene.StyleGenerator[0].alignedDimensions:
-                            if alignedDimStyle.name == alignedDim.style:
-                                alignedDimProps= alignedDimStyle
+                        alignedDimProps = get_style(context.scene, 'alignedDimensions', alignedDim.style, alignedDim)
 
                     update_text(textobj=alignedDim,props=alignedDimProps,context=context)
                 
                 for angleDim in DimGen.angleDimensions: 
                     dimProps = angleDim
                     if angleDim.uses_style:
-                        for dimStyle in context.scene.StyleGenerator[0].alignedDimensions:
-                            if dimStyle.name == angleDim.style:
-                                dimProps= dimStyle
+                        dimProps = get_style(context.scene, 'alignedDimensions', angleDim.style, angleDim)
                     update_text(textobj=angleDim,props=dimProps,context=context)
                 
                 for axisDim in DimGen.axisDimensions: 
                     dimProps = axisDim
                     if axisDim.uses_style:
-                        for dimStyle in context.scene.StyleGenerator[0].alignedDimensions:
-                            if dimStyle.name == axisDim.style:
-                                dimProps= dimStyle
+                        dimProps = get_style(context.scene, 'alignedDimensions', axisDim.style, axisDim)
                     update_text(textobj=axisDim,props=dimProps,context=context)
             
             if 'AnnotationGenerator' in myobj:
@@ -513,18 +491,22 @@ def draw_main(context):
                     annotation = annotationGen.annotations[idx]
                     annotationProps = annotation
                     if annotation.uses_style:
-                        for annotationStyle in context.scene.StyleGenerator[0].annotations:
-                            if annotationStyle.name == annotation.style:
-                                annotationProps = annotationStyle
+                        annotationProps = get_style(context.scene, 'annotations', annotation.style, annotation)
                     if annotation.annotationTextSource is not '':
-                        try:
-                            annotation.text = myobj[annotation.annotationTextSource]
-                        except:
+                        sourceText = myobj[annotation.annotationTextSource]
+                        if not isinstance(sourceText, str):
                             pr = scene.measureit_arch_gl_precision
                             fmt = "%1." + str(pr) + "f"
-                            annotation.text = fmt % myobj[annotation.annotationTextSource]
+                            sourceText = fmt % sourceText
+                        # Assigning fires update_flag, only do it when the
+                        # source changed so the item revision stays put
+                        if annotation.text != sourceText:
+                            annotation.text = sourceText
                     update_text(textobj=annotation,props=annotationProps,context=context)
 
+    # Rasterize every label that changed this frame in one pass
+    rasterize_text_queue(context)
+
 
 def draw_main_3d (context):
    
@@ -536,19 +518,24 @@ def draw_main_3d (context):
     else:
         objlist = context.view_layer.objects
 
+    # Items outside this view are skipped by the draw functions
+    # and small items are simplified
+    rv3d = context.region_data
+    if rv3d is not None:
+        set_view_frustum(rv3d.perspective_matrix, (context.region.width, context.region.height))
+
+    # Labels drawn by this pass are measured and rasterized by draw_main
+    begin_text_pass()
+
     # ---------------------------------------
     # Generate all OpenGL calls
     # ---------------------------------------
 
     for myobj in objlist:
-        #Stash Object Vertices for use in Draw functions
-        #                
+        # Object Vertices are read from the vertex cache by the Draw functions
         if myobj.visible_get() is True:
             mat = myobj.matrix_world
 
-            if 'LineGenerator' in myobj or 'AnnotationGenerator' in myobj or 'DimensionGenerator' in myobj:
-                myobj['obverts'] = get_mesh_vertices(myobj)
-
             if 'LineGenerator' in myobj and myobj.LineGenerator[0].line_num != 0:
                 lineGen = myobj.LineGenerator[0]
                 draw_line_group(context,myobj,lineGen,mat)
@@ -576,11 +563,7 @@ def draw_main_3d (context):
         for obj_int in deps.object_instances:
             if obj_int.is_instance:
                 myobj = obj_int.object
-                
-                if 'LineGenerator' in myobj or 'AnnotationGenerator' in myobj or 'DimensionGenerator' in myobj:
-                    if 'obverts' not in myobj:
-                        myobj['obverts'] = get_mesh_vertices(myobj) 
-                        mat = obj_int.matrix_world
+                mat = obj_int.matrix_world
 
                 if 'LineGenerator' in myobj and myobj.LineGenerator[0].line_num != 0:
                     lineGen = myobj.LineGenerator[0]
@@ -600,6 +583,11 @@ def draw_main_3d (context):
                         for axisDim in DimGen.axisDimensions:
                             draw_axisDimension(context,myobj,DimGen,axisDim,mat)
 
+    # Submit the merged geometry and text of all objects
+    get_render_list(context).flush()
+    draw_text_queue()
+    set_view_frustum(None)
+
 # -------------------------------------------------------------
 # Handlers for drawing OpenGl
 # -------------------------------------------------------------
@@ -45,6 +45,11 @@ import numpy as np
 import bmesh
 from .measureit_arch_geometry import *
 from .measureit_arch_main import draw_main, draw_main_3d
+from .measureit_arch_culling import set_view_frustum
+from .measureit_arch_textures import begin_text_pass
+from .measureit_arch_cache import get_evaluated_mesh, get_evaluated_key, release_evaluated_tris
+from .measureit_arch_renderlist import get_render_list
+from .measureit_arch_shaders import get_shader
 from bpy.props import IntProperty
 from bpy.types import PropertyGroup, Panel, Object, Operator, SpaceView3D
 
@@ -272,6 +277,10 @@ def render_main(self, context, animation=False):
 
         draw_scene(self, context, projection_matrix) 
 
+        # Items outside the camera are skipped by the draw functions
+        set_view_frustum(projection_matrix @ view_matrix_3d)
+        begin_text_pass()
+
         
         # Clear Color Keep on depth info
         bgl.glClear(bgl.GL_COLOR_BUFFER_BIT)
@@ -338,6 +347,18 @@ def render_main(self, context, animation=False):
                             draw_angleDimension(context, myobj, DimGen, angleDim,mat)
                         for axisDim in DimGen.axisDimensions:
                             draw_axisDimension(context,myobj,DimGen,axisDim,mat)
+
+        # Labels are rasterized in their own offscreen,
+        # before the matrices of the 3D pass are loaded again
+        queue_render_text(context)
+
+        # Submit the merged geometry of all objects
+        gpu.matrix.reset()
+        gpu.matrix.load_matrix(view_matrix_3d)
+        gpu.matrix.load_projection_matrix(projection_matrix)
+        get_render_list(context).flush()
+        draw_text_queue()
+        set_view_frustum(None)
         
         # -----------------------------
         # Draw a rectangle frame
@@ -413,6 +434,31 @@ def save_image(self, filepath, myimage):
         return
 
 
+# Object space depth batches keyed by object name, kept across
+# renders while the evaluated mesh they were built from is current
+_depth_batches = {}
+
+
+#--------------------------------------
+# Get the depth batch of a mesh object
+# returns None when the mesh has no faces
+#--------------------------------------
+def get_depth_batch(obj, deps, shader):
+    key = get_evaluated_key(obj)
+    entry = _depth_batches.get(obj.original.name)
+    if entry is not None and entry['key'] == key:
+        return entry['batch']
+
+    geometry = get_evaluated_mesh(obj, deps, with_tris=True)
+    batch = None
+    if len(geometry['tris']) > 0:
+        batch = batch_for_shader(shader, 'TRIS', {"pos": geometry['verts']},
+                                 indices=geometry['tris'])
+    release_evaluated_tris(obj)
+    _depth_batches[obj.original.name] = {'key': key, 'batch': batch}
+    return batch
+
+
 #--------------------------------------
 # Draw Scene Geometry for Depth Buffer
 #--------------------------------------
@@ -422,34 +468,29 @@ def draw_scene(self, context, projection_matrix):
     bgl.glDepthFunc(bgl.GL_LESS)   
 
     # Get List of Mesh Objects
-    objs = []
     deps = bpy.context.view_layer.depsgraph
+    shader = get_shader('depthOnly')
+    drawn = set()
     for obj_int in deps.object_instances:
         obj = obj_int.object
         if obj.type == 'MESH' and obj.hide_render == False :
 
-            mat = obj_int.matrix_world
-            obj_eval = obj.evaluated_get(deps)
-            mesh = obj_eval.to_mesh(preserve_all_data_layers=True, depsgraph=bpy.context.view_layer.depsgraph)
-            mesh.calc_loop_triangles()
-            tris = mesh.loop_triangles
-            vertices = []
-            indices = []
-
-            for vert in mesh.vertices:
-                # Multipy vertex Position by Object Transform Matrix
-                vertices.append(mat @ vert.co)
-
-            for tri in tris:
-                indices.append(tri.vertices)      
-
-            #shader = gpu.shader.from_builtin('3D_UNIFORM_COLOR')
-            shader = gpu.types.GPUShader(Base_Shader_3D.vertex_shader, DepthOnlyFrag.fragment_shader)
-            batch = batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices)
-            batch.program_set(shader)
-            batch.draw()
-            gpu.shader.unbind()
-            obj_eval.to_mesh_clear()
+            batch = get_depth_batch(obj, deps, shader)
+            drawn.add(obj.original.name)
+            if batch is None:
+                continue
+
+            # Instances share the batch, the object transform is
+            # applied through the model view matrix
+            gpu.matrix.push()
+            gpu.matrix.multiply_matrix(obj_int.matrix_world)
+            batch.draw(shader)
+            gpu.matrix.pop()
+
+    # Drop the batches of objects that are no longer rendered
+    for name in list(_depth_batches.keys()):
+        if name not in drawn:
+            del _depth_batches[name]
 
     #Write to Image for Debug
     debug=False
@@ -471,4 +512,8 @@ def draw_scene(self, context, projection_matrix):
         image.scale(width, height)
         image.pixels = [v / 255 for v in buffer]
 
-    bgl.glDisable(bgl.GL_DEPTH_TEST)
\ No newline at end of file
+    bgl.glDisable(bgl.GL_DEPTH_TEST)
+
+
+def unregister():
+    _depth_batches.clear()
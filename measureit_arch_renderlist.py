@@ -0,0 +1,215 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# ----------------------------------------------------------
+# File: measureit_arch_renderlist.py
+# Collects the geometry of all items per shader and style so
+# every bucket is submitted with a single draw call
+# Author: Kevan Cress
+#
+# ----------------------------------------------------------
+import bgl
+import gpu
+import numpy as np
+from gpu_extras.batch import batch_for_shader
+
+# Texture of a bucket that samples the scene depth, the depth
+# buffer is copied once per flush when a bucket needs it
+DEPTH_TEXTURE = 'DEPTH'
+
+# GL texture the scene depth is copied into
+_depth_texture = None
+
+
+# --------------------------------------------------------------------
+# A frame worth of geometry sorted into buckets
+# Items with the same shader, primitive type, uniforms and gl state
+# share a bucket. A bucket whose items all passed a signature reuses
+# last frames merged batch if none of the signatures changed
+# --------------------------------------------------------------------
+class RenderList():
+    def __init__(self):
+        self.buckets = {}
+        self.merged = {}
+
+    # ------------------------------
+    # Queue geometry for drawing
+    # shader: GPUShader to draw with
+    # primType: 'POINTS', 'LINES' or 'TRIS'
+    # uniforms: dict of uniform name and value
+    # pos: vertex positions
+    # arcLength: per vertex arc length for dashed shaders
+    # signature: hashable key of the geometry, None when volatile
+    # uv: per vertex texture coordinates for textured shaders
+    # texture: GL texture bound to unit 0 while drawing,
+    #          DEPTH_TEXTURE for a copy of the scene depth
+    # attributes: dict of other per vertex attributes by name
+    # ------------------------------
+    def add(self, shader, primType, uniforms, pos, arcLength=None, signature=None,
+            depthFunc=bgl.GL_LEQUAL, smooth=False, uv=None, texture=None, attributes=None):
+        pos = np.asarray(pos, dtype=np.float32).reshape((-1, 3))
+        if len(pos) == 0:
+            return
+
+        attrs = {}
+        if arcLength is not None:
+            attrs['arcLength'] = np.asarray(arcLength, dtype=np.float32).ravel()
+        if uv is not None:
+            attrs['uv'] = np.asarray(uv, dtype=np.float32).reshape((-1, 2))
+        if attributes is not None:
+            for name, value in attributes.items():
+                value = np.asarray(value, dtype=np.float32).reshape((len(pos), -1))
+                if value.shape[1] == 1:
+                    value = value.ravel()
+                attrs[name] = value
+
+        uniformKey = tuple(sorted((name, freeze(value)) for name, value in uniforms.items()))
+        key = (id(shader), primType, uniformKey, depthFunc, smooth, texture,
+               tuple(sorted(attrs.keys())))
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = {
+                'shader': shader,
+                'type': primType,
+                'uniforms': uniformKey,
+                'depthFunc': depthFunc,
+                'smooth': smooth,
+                'texture': texture,
+                'pos': [],
+                'attrs': {name: [] for name in attrs},
+                'sigs': []
+            }
+            self.buckets[key] = bucket
+
+        bucket['pos'].append(pos)
+        for name, value in attrs.items():
+            bucket['attrs'][name].append(value)
+        bucket['sigs'].append(signature)
+
+    # ------------------------------
+    # Draw every bucket and start a new frame
+    # ------------------------------
+    def flush(self):
+        merged = {}
+        depthOrigin = None
+        bgl.glEnable(bgl.GL_MULTISAMPLE)
+        bgl.glEnable(bgl.GL_BLEND)
+        bgl.glEnable(bgl.GL_DEPTH_TEST)
+        bgl.glDepthMask(False)
+
+        for key, bucket in self.buckets.items():
+            shader = bucket['shader']
+            sigs = tuple(bucket['sigs'])
+            stable = None not in sigs
+
+            cached = self.merged.get(key)
+            if stable and cached is not None and cached[0] == sigs:
+                batch = cached[1]
+            else:
+                content = {"pos": np.concatenate(bucket['pos'])}
+                for name, values in bucket['attrs'].items():
+                    content[name] = np.concatenate(values)
+                batch = batch_for_shader(shader, bucket['type'], content)
+                batch.program_set(shader)
+            if stable:
+                merged[key] = (sigs, batch)
+
+            bgl.glDepthFunc(bucket['depthFunc'])
+            if bucket['smooth']:
+                bgl.glEnable(bgl.GL_POLYGON_SMOOTH)
+            texture = bucket['texture']
+            if texture == DEPTH_TEXTURE:
+                if depthOrigin is None:
+                    depthOrigin = copy_depth()
+                texture = _depth_texture
+            if texture is not None:
+                bgl.glActiveTexture(bgl.GL_TEXTURE0)
+                bgl.glBindTexture(bgl.GL_TEXTURE_2D, texture)
+
+            shader.bind()
+            for name, value in bucket['uniforms']:
+                shader.uniform_float(name, value)
+            if bucket['texture'] == DEPTH_TEXTURE:
+                shader.uniform_float("depthOrigin", depthOrigin)
+            batch.draw()
+            gpu.shader.unbind()
+
+            if bucket['smooth']:
+                bgl.glDisable(bgl.GL_POLYGON_SMOOTH)
+            if bucket['texture'] is not None:
+                bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+
+        self.merged = merged
+        self.buckets = {}
+
+        bgl.glDepthFunc(bgl.GL_LESS)
+        bgl.glDisable(bgl.GL_DEPTH_TEST)
+        bgl.glDepthMask(True)
+
+
+# --------------------------------------------------------------------
+# Copy the depth buffer of the bound framebuffer into _depth_texture
+# returns the window position of the copied viewport
+# --------------------------------------------------------------------
+def copy_depth():
+    global _depth_texture
+    if _depth_texture is None:
+        texBuf = bgl.Buffer(bgl.GL_INT, 1)
+        bgl.glGenTextures(1, texBuf)
+        _depth_texture = texBuf[0]
+
+    viewport = bgl.Buffer(bgl.GL_INT, 4)
+    bgl.glGetIntegerv(bgl.GL_VIEWPORT, viewport)
+
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, _depth_texture)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_NEAREST)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_NEAREST)
+    bgl.glCopyTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_DEPTH_COMPONENT,
+                         viewport[0], viewport[1], viewport[2], viewport[3], 0)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+    return (viewport[0], viewport[1])
+
+
+# --------------------------------------------------------------------
+# Make a uniform value hashable
+# --------------------------------------------------------------------
+def freeze(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return tuple(float(v) for v in value)
+
+
+# Viewport and render keep their own lists so they
+# don't evict each others merged batches
+_viewport_list = RenderList()
+_render_list = RenderList()
+
+
+def get_render_list(context):
+    if context.scene.measureit_arch_is_render_draw:
+        return _render_list
+    return _viewport_list
+
+
+def unregister():
+    global _depth_texture
+    if _depth_texture is not None:
+        texBuf = bgl.Buffer(bgl.GL_INT, 1, [_depth_texture])
+        bgl.glDeleteTextures(1, texBuf)
+        _depth_texture = None
@@ -0,0 +1,279 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# ----------------------------------------------------------
+# File: measureit_arch_sdf.py
+# Signed distance field glyph atlas for resolution independent text
+# Author: Kevan Cress
+#
+# ----------------------------------------------------------
+import bpy
+import bgl
+import blf
+import gpu
+import math
+import numpy as np
+from mathutils import Matrix
+from bpy.app.handlers import persistent
+
+# Characters baked into every glyph atlas
+SDF_CHARS = ''.join(chr(c) for c in range(32, 127)) + '°²³µ'
+
+# Size of a glyph cell in the atlas, in pixels
+SDF_CELL = 64
+
+# Font size the glyphs are rasterized at
+SDF_FONT_SIZE = 40
+
+# Distance in pixels covered by the field on each side of the outline
+SDF_SPREAD = 8
+
+# Glyphs per atlas row
+SDF_COLUMNS = 16
+
+# Glyph atlas per blf font id
+_atlases = {}
+
+# Laid out glyph quads per text item pointer, as (lines, quads)
+_layouts = {}
+
+
+# --------------------------------------------------------------------
+# Glyph atlas of a single font
+# Holds the distance field texture and the metrics used for layout
+# --------------------------------------------------------------------
+class GlyphAtlas():
+    def __init__(self, font_id):
+        self.font_id = font_id
+        rows = math.ceil(len(SDF_CHARS) / SDF_COLUMNS)
+        self.width = SDF_COLUMNS * SDF_CELL
+        self.height = rows * SDF_CELL
+
+        blf.size(font_id, SDF_FONT_SIZE, 72)
+        self.lineHeight = blf.dimensions(font_id, 'Tp')[1]
+        self.baseline = self.lineHeight / 5
+        self.cellBaseline = SDF_SPREAD + SDF_FONT_SIZE / 4
+
+        self.glyphs = {}
+        for idx, char in enumerate(SDF_CHARS):
+            col = idx % SDF_COLUMNS
+            row = idx // SDF_COLUMNS
+            self.glyphs[char] = {
+                'advance': blf.dimensions(font_id, char)[0],
+                'x': col * SDF_CELL,
+                'y': row * SDF_CELL
+            }
+
+        mask = self.rasterize()
+        field = np.zeros((self.height, self.width), dtype=np.float32)
+        for glyph in self.glyphs.values():
+            x = glyph['x']
+            y = glyph['y']
+            cell = mask[y:y + SDF_CELL, x:x + SDF_CELL]
+            field[y:y + SDF_CELL, x:x + SDF_CELL] = compute_sdf(cell, SDF_SPREAD)
+
+        self.texture = upload_field(field)
+
+    # ------------------------------
+    # Draw every glyph white on black into one offscreen
+    # and read it back in a single pass
+    # returns a (height, width) bool coverage mask
+    # ------------------------------
+    def rasterize(self):
+        width = self.width
+        height = self.height
+        offscreen = gpu.types.GPUOffScreen(width, height)
+        buffer = bgl.Buffer(bgl.GL_BYTE, width * height * 4)
+
+        with offscreen.bind():
+            bgl.glClearColor(0, 0, 0, 0)
+            bgl.glClear(bgl.GL_COLOR_BUFFER_BIT)
+
+            view_matrix = Matrix([
+                [2 / width, 0, 0, -1],
+                [0, 2 / height, 0, -1],
+                [0, 0, 1, 0],
+                [0, 0, 0, 1]])
+
+            gpu.matrix.reset()
+            gpu.matrix.load_matrix(view_matrix)
+            gpu.matrix.load_projection_matrix(Matrix.Identity(4))
+
+            blf.color(self.font_id, 1, 1, 1, 1)
+            blf.size(self.font_id, SDF_FONT_SIZE, 72)
+            for char, glyph in self.glyphs.items():
+                blf.position(self.font_id, glyph['x'] + SDF_SPREAD, glyph['y'] + self.cellBaseline, 0)
+                blf.draw(self.font_id, char)
+
+            bgl.glReadBuffer(bgl.GL_BACK)
+            bgl.glReadPixels(0, 0, width, height, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, buffer)
+        offscreen.free()
+
+        pixels = np.asarray(buffer, dtype=np.uint8).reshape((height, width, 4))
+        return pixels[:, :, 0] > 127
+
+    def free(self):
+        texBuf = bgl.Buffer(bgl.GL_INT, 1, [self.texture])
+        bgl.glDeleteTextures(1, texBuf)
+
+
+# --------------------------------------------------------------------
+# Signed distance field of a coverage mask
+# 0.5 on the outline, towards 1 inside and 0 outside
+# --------------------------------------------------------------------
+def compute_sdf(mask, spread):
+    height, width = mask.shape
+
+    # Outline pixels are covered pixels with an uncovered 4-neighbour
+    padded = np.pad(mask, 1, mode='constant')
+    interior = (padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:])
+    edgeY, edgeX = np.nonzero(mask & ~interior)
+    if len(edgeY) == 0:
+        return np.zeros((height, width), dtype=np.float32)
+
+    pixY, pixX = np.mgrid[0:height, 0:width]
+    pixY = pixY.ravel()
+    pixX = pixX.ravel()
+    dist2 = np.empty(len(pixY), dtype=np.float32)
+
+    # Chunked so the pixel x edge distance matrix stays small
+    chunk = 1024
+    for start in range(0, len(pixY), chunk):
+        dy = pixY[start:start + chunk, None] - edgeY[None, :]
+        dx = pixX[start:start + chunk, None] - edgeX[None, :]
+        dist2[start:start + chunk] = (dy * dy + dx * dx).min(axis=1)
+
+    dist = np.sqrt(dist2).reshape((height, width))
+    dist = np.where(mask, dist, -dist)
+    return np.clip(0.5 + dist / (2 * spread), 0, 1).astype(np.float32)
+
+
+def upload_field(field):
+    height, width = field.shape
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    pixels[:, :, 0] = (field * 255).astype(np.uint8)
+    pixels[:, :, 3] = 255
+
+    texBuf = bgl.Buffer(bgl.GL_INT, 1)
+    bgl.glGenTextures(1, texBuf)
+    buffer = bgl.Buffer(bgl.GL_BYTE, width * height * 4, pixels.ravel())
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, texBuf[0])
+    bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA, width, height, 0,
+                     bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, buffer)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+    return texBuf[0]
+
+
+# --------------------------------------------------------------------
+# Get the glyph atlas of a font, built on first use
+# --------------------------------------------------------------------
+def get_glyph_atlas(font_id):
+    atlas = _atlases.get(font_id)
+    if atlas is None:
+        atlas = GlyphAtlas(font_id)
+        _atlases[font_id] = atlas
+    return atlas
+
+
+# --------------------------------------------------------------------
+# Lay out lines of text as glyph quads
+# returns the normalized card position (N*6,2) and atlas uv (N*6,2)
+# of two triangles per glyph. Cached per item so changing a
+# value only lays out the glyphs of that item again
+# --------------------------------------------------------------------
+def get_text_quads(textobj, atlas, lines):
+    key = textobj.as_pointer()
+    lines = tuple(lines)
+    cached = _layouts.get(key)
+    if cached is not None and cached[0] == (atlas.font_id, lines):
+        return cached[1]
+
+    corners = np.array([(0, 0), (0, 1), (1, 1), (0, 0), (1, 1), (1, 0)], dtype=np.float32)
+    pos = []
+    uvs = []
+    textWidth = 0
+    textHeight = atlas.lineHeight * len(lines)
+    for lineNum, line in enumerate(lines):
+        penX = 0
+        baseY = textHeight - atlas.lineHeight * (lineNum + 1) + atlas.baseline
+        for char in line:
+            glyph = atlas.glyphs.get(char, atlas.glyphs['?'])
+            if char != ' ':
+                origin = (penX - SDF_SPREAD, baseY - atlas.cellBaseline)
+                pos.append(corners * SDF_CELL + origin)
+                uvs.append((corners * SDF_CELL + (glyph['x'], glyph['y'])) / (atlas.width, atlas.height))
+            penX += glyph['advance']
+        textWidth = max(textWidth, penX)
+
+    if len(pos) == 0 or textWidth == 0:
+        quads = None
+    else:
+        pos = np.concatenate(pos) / (textWidth, textHeight)
+        quads = (pos.astype(np.float32), np.concatenate(uvs).astype(np.float32))
+
+    _layouts[key] = ((atlas.font_id, lines), quads)
+    return quads
+
+
+# --------------------------------------------------------------------
+# Map laid out glyphs onto a text card
+# card: the four corners of the card
+# cardUVs: which corner of the text each card corner shows
+# --------------------------------------------------------------------
+def map_to_card(pos, card, cardUVs):
+    corners = {}
+    for corner, uv in zip(card, cardUVs):
+        corners[(round(uv[0]), round(uv[1]))] = np.array(corner, dtype=np.float32)
+    origin = corners[(0, 0)]
+    axisX = corners[(1, 0)] - origin
+    axisY = corners[(0, 1)] - origin
+    return origin + pos[:, 0:1] * axisX + pos[:, 1:2] * axisY
+
+
+# --------------------------------------------------------------------
+# Drop the glyph layouts after text items were added or removed,
+# the item pointers they are keyed by may now belong to other items
+# --------------------------------------------------------------------
+def free_text_layouts():
+    _layouts.clear()
+
+
+def free_glyph_atlases():
+    for atlas in _atlases.values():
+        atlas.free()
+    _atlases.clear()
+    _layouts.clear()
+
+
+@persistent
+def sdf_load_handler(dummy):
+    free_glyph_atlases()
+
+
+def register():
+    if sdf_load_handler not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(sdf_load_handler)
+
+
+def unregister():
+    free_glyph_atlases()
+    if sdf_load_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(sdf_load_handler)
@@ -0,0 +1,72 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# ----------------------------------------------------------
+# File: measureit_arch_shaders.py
+# Compiles the programs from shaders.py on first use and keeps
+# them for the session. Nothing is compiled at import, so the
+# add-on also loads in background mode where there is no GL context
+# Author: Kevan Cress
+#
+# ----------------------------------------------------------
+import gpu
+from .shaders import *
+
+# Sources of each program by name, as (vertex, fragment, geometry)
+SHADER_SOURCES = {
+    'base2D': (Base_Shader_2D.vertex_shader, Base_Shader_2D.fragment_shader, None),
+    'line': (Base_Shader_3D.vertex_shader, Line_Shader_3D.fragment_shader,
+             Line_Shader_3D.geometry_shader),
+    'lineAdj': (Base_Shader_3D.vertex_shader, Line_Shader_3D.fragment_shader,
+                Line_Adjacency_Shader_3D.geometry_shader),
+    'tri': (Base_Shader_3D.vertex_shader, Base_Shader_3D.fragment_shader, None),
+    'hiddenLine': (Hidden_Line_Shader_3D.vertex_shader, Hidden_Line_Shader_3D.fragment_shader,
+                   Hidden_Line_Shader_3D.geometry_shader),
+    'dashedLine': (Dashed_Shader_3D.vertex_shader, Dashed_Shader_3D.fragment_shader,
+                   Dashed_Shader_3D.geometry_shader),
+    'endCap': (End_Cap_Shader_3D.vertex_shader, End_Cap_Shader_3D.fragment_shader,
+               End_Cap_Shader_3D.geometry_shader),
+    'point': (Point_Shader_3D.vertex_shader, Point_Shader_3D.fragment_shader,
+              Point_Shader_3D.geometry_shader),
+    'text': (Text_Shader.vertex_shader, Text_Shader.fragment_shader, None),
+    'sdfText': (SDF_Text_Shader.vertex_shader, SDF_Text_Shader.fragment_shader, None),
+    'depthOnly': (Base_Shader_3D.vertex_shader, DepthOnlyFrag.fragment_shader, None),
+}
+
+# Compiled programs by name
+_shaders = {}
+
+
+# --------------------------------------------------------------------
+# Get a compiled program, compiling it the first time it is used
+# --------------------------------------------------------------------
+def get_shader(name):
+    shader = _shaders.get(name)
+    if shader is None:
+        vertex, fragment, geometry = SHADER_SOURCES[name]
+        if geometry is None:
+            shader = gpu.types.GPUShader(vertex, fragment)
+        else:
+            shader = gpu.types.GPUShader(vertex, fragment, geocode=geometry)
+        _shaders[name] = shader
+    return shader
+
+
+def unregister():
+    _shaders.clear()
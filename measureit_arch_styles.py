@@ -38,6 +38,7 @@ from bpy.props import (
         )
 
 from .measureit_arch_baseclass import DeletePropButton
+from .measureit_arch_cache import invalidate_style_index
 from .measureit_arch_dimensions import AlignedDimensionProperties, recalc_dimWrapper_index
 from .measureit_arch_annotations import AnnotationProperties
 from .measureit_arch_lines import LineProperties
@@ -59,6 +60,7 @@ def recalc_index(self,context):
         elif style.itemType == 'A':
             style.itemIndex = id_a
             id_a += 1
+    invalidate_style_index()
 
 # A Wrapper Object so multiple MeasureIt-ARCH element
 # types can be shown in the same UI List
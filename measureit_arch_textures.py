@@ -0,0 +1,599 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# ----------------------------------------------------------
+# File: measureit_arch_textures.py
+# Rasterization and texture atlas for the text of dimensions and annotations
+# Author: Kevan Cress
+#
+# ----------------------------------------------------------
+import bpy
+import bgl
+import gpu
+import blf
+import time
+import numpy as np
+from mathutils import Matrix
+from collections import OrderedDict
+from gpu_extras.batch import batch_for_shader
+from bpy.app.handlers import persistent
+from .measureit_arch_sdf import free_text_layouts
+
+# Size of a regular atlas page, labels that don't fit get a page of their own
+ATLAS_PAGE_SIZE = 2048
+
+# Pages kept before old labels are evicted and the pages repacked
+MAX_ATLAS_PAGES = 4
+
+# Transparent border around each label so linear filtering
+# never samples a neighbouring label
+ATLAS_PADDING = 1
+
+_pages = []
+
+# Atlas region per text item keyed by the items pointer
+_regions = {}
+
+# Text cards queued for this frame as (card, uvs, region)
+_text_queue = []
+
+# Bumped each time the queued text is drawn, used for eviction
+_frame = 0
+
+# Rasterized text pixels per text item pointer, least recently used first.
+# Process local so the pixels never end up in the .blend or undo steps
+_pixel_store = OrderedDict()
+_pixel_store_bytes = 0
+
+# Memory budget of the pixel store, older labels are dropped
+# and rasterized again when they are needed
+PIXEL_STORE_BUDGET = 256 * 1024 * 1024
+
+# Labels waiting to be rasterized this frame as (priority, textobj, job)
+_raster_queue = []
+
+# Time the first label of this frame was queued
+_raster_start = None
+
+# Offscreen reused by every rasterization pass, as (size, GPUOffScreen)
+_raster_surface = None
+
+# Size of the offscreen the labels of a frame are rasterized into
+RASTER_SURFACE_SIZE = 2048
+
+# Milliseconds per viewport redraw spent regenerating text, labels
+# over budget keep their text_updated flag and are done next redraw
+TEXT_UPDATE_BUDGET_MS = 8
+
+# Pointers of the text items the last 3D pass drew at full detail.
+# Only these are measured and rasterized, labels outside the view or
+# too small to read keep text_updated until they are drawn
+_text_drawn = set()
+
+
+# --------------------------------------------------------------------
+# Shelf packer for a square surface
+# Labels are placed left to right on horizontal shelves, a new shelf
+# is opened below the last one when no shelf has room
+# --------------------------------------------------------------------
+class ShelfPacker():
+    def __init__(self, size):
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.shelves = []
+        self.nextY = 0
+
+    # Find room for a width x height label
+    # returns the lower left corner or None when the surface is full
+    def pack(self, width, height):
+        width += ATLAS_PADDING * 2
+        height += ATLAS_PADDING * 2
+        if width > self.size:
+            return None
+
+        bestShelf = None
+        for shelf in self.shelves:
+            y, shelfHeight, x = shelf
+            if height <= shelfHeight and x + width <= self.size:
+                if bestShelf is None or shelfHeight < bestShelf[1]:
+                    bestShelf = shelf
+
+        if bestShelf is None:
+            if self.nextY + height > self.size:
+                return None
+            bestShelf = [self.nextY, height, 0]
+            self.shelves.append(bestShelf)
+            self.nextY += height
+
+        x = bestShelf[2]
+        bestShelf[2] += width
+        return (x + ATLAS_PADDING, bestShelf[0] + ATLAS_PADDING)
+
+
+# --------------------------------------------------------------------
+# One texture page of the atlas
+# --------------------------------------------------------------------
+class AtlasPage(ShelfPacker):
+    def __init__(self, size):
+        self.texture = gen_texture()
+        ShelfPacker.__init__(self, size)
+        self.clear()
+
+    # Reset the packer and the page contents
+    def clear(self):
+        self.reset()
+        empty = bgl.Buffer(bgl.GL_BYTE, self.size * self.size * 4)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.texture)
+        bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA, self.size, self.size, 0,
+                         bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, empty)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+
+    def upload(self, x, y, width, height, pixels):
+        buffer = bgl.Buffer(bgl.GL_BYTE, width * height * 4, pixels)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.texture)
+        bgl.glTexSubImage2D(bgl.GL_TEXTURE_2D, 0, x, y, width, height,
+                            bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, buffer)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+
+    def free(self):
+        texBuf = bgl.Buffer(bgl.GL_INT, 1, [self.texture])
+        bgl.glDeleteTextures(1, texBuf)
+
+
+# --------------------------------------------------------------------
+# Start the text marks of a new 3D pass
+# --------------------------------------------------------------------
+def begin_text_pass():
+    _text_drawn.clear()
+
+
+def mark_text_drawn(textobj):
+    _text_drawn.add(textobj.as_pointer())
+
+
+def is_text_drawn(textobj):
+    return textobj.as_pointer() in _text_drawn
+
+
+# --------------------------------------------------------------------
+# Queue a label for rasterization
+# job: dict with the font_id, rgb, size, resolution, lines,
+#      lineHeight, width and height of the label
+# priority: sort key, lower values are rasterized first
+# --------------------------------------------------------------------
+def queue_text_raster(textobj, job, priority=(0, 0)):
+    global _raster_start
+    if _raster_start is None:
+        _raster_start = time.perf_counter()
+    _raster_queue.append((priority, textobj, job))
+
+
+# --------------------------------------------------------------------
+# Rasterize the queued labels
+# Labels are laid out side by side in one reused offscreen and read
+# back with a single glReadPixels, more passes are only needed when
+# they don't fit on one surface.
+# Labels are done in priority order until budgetMs runs out, the rest
+# is queued again by the next redraw. The render passes None to
+# rasterize everything in one go
+# --------------------------------------------------------------------
+def rasterize_text_queue(context, budgetMs=TEXT_UPDATE_BUDGET_MS):
+    global _raster_start
+    if len(_raster_queue) == 0:
+        return
+
+    queue = sorted(_raster_queue, key=lambda item: item[0])
+    jobs = [(textobj, job) for priority, textobj, job in queue]
+    _raster_queue.clear()
+
+    if budgetMs is None:
+        deadline = None
+    else:
+        deadline = _raster_start + budgetMs / 1000
+    _raster_start = None
+
+    lastLabel = None
+    leftover = False
+    replaced = False
+    while len(jobs) > 0:
+        largest = max(max(job['width'], job['height']) for textobj, job in jobs)
+        size, offscreen = get_raster_surface(max(RASTER_SURFACE_SIZE, largest + ATLAS_PADDING * 2))
+        packer = ShelfPacker(size)
+
+        placed = []
+        remaining = []
+        for textobj, job in jobs:
+            pos = packer.pack(job['width'], job['height'])
+            if pos is None:
+                remaining.append((textobj, job))
+            else:
+                placed.append((textobj, job, pos))
+        jobs = remaining
+
+        usedHeight = packer.nextY
+        buffer = bgl.Buffer(bgl.GL_BYTE, size * usedHeight * 4)
+        with offscreen.bind():
+            view_matrix = Matrix([
+                [2 / size, 0, 0, -1],
+                [0, 2 / size, 0, -1],
+                [0, 0, 1, 0],
+                [0, 0, 0, 1]])
+
+            gpu.matrix.reset()
+            gpu.matrix.load_matrix(view_matrix)
+            gpu.matrix.load_projection_matrix(Matrix.Identity(4))
+
+            # Clear each label to its own color so the
+            # edges blend towards the text color
+            drawn = []
+            bgl.glEnable(bgl.GL_SCISSOR_TEST)
+            for textobj, job, pos in placed:
+                # Always make progress, at least one label per redraw
+                if deadline is not None and len(drawn) > 0 and time.perf_counter() > deadline:
+                    jobs = []
+                    leftover = True
+                    break
+                rgb = job['rgb']
+                bgl.glScissor(pos[0], pos[1], job['width'], job['height'])
+                bgl.glClearColor(rgb[0], rgb[1], rgb[2], 0)
+                bgl.glClear(bgl.GL_COLOR_BUFFER_BIT)
+                draw_text_job(job, pos)
+                drawn.append((textobj, job, pos))
+            bgl.glDisable(bgl.GL_SCISSOR_TEST)
+
+            # Read Offscreen To Texture Buffer
+            bgl.glReadBuffer(bgl.GL_BACK)
+            bgl.glReadPixels(0, 0, size, usedHeight, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, buffer)
+
+        pixels = np.asarray(buffer, dtype=np.uint8).reshape((usedHeight, size, 4))
+        for textobj, job, pos in drawn:
+            x, y = pos
+            label = pixels[y:y + job['height'], x:x + job['width']]
+            if not has_text_image(textobj):
+                replaced = True
+            set_text_pixels(textobj, label.ravel())
+            textobj.text_updated = False
+            textobj.texture_updated = True
+            for textField in textobj.textField:
+                textField.text_updated = False
+            lastLabel = (job['width'], job['height'], label)
+
+    # generate image datablock from buffer for debug preview
+    # ONLY USE FOR DEBUG. SERIOUSLY SLOWS PREFORMANCE
+    if context.scene.measureit_arch_debug_text and lastLabel is not None:
+        width, height, label = lastLabel
+        if not str('test') in bpy.data.images:
+            bpy.data.images.new(str('test'), width, height)
+        image = bpy.data.images[str('test')]
+        image.scale(width, height)
+        image.pixels = (label.ravel() / 255).tolist()
+
+    # Labels left over budget still have text_updated set, and labels
+    # that were drawn as placeholders now have pixels. Redraw so both
+    # are picked up without waiting for user input
+    if (leftover or replaced) and context.area is not None:
+        context.area.tag_redraw()
+
+
+def draw_text_job(job, pos):
+    font_id = job['font_id']
+    rgb = job['rgb']
+    lineHeight = job['lineHeight']
+    blf.color(font_id, rgb[0], rgb[1], rgb[2], rgb[3])
+    blf.size(font_id, job['size'], job['resolution'])
+
+    linenum = 1
+    for line in job['lines']:
+        ypos = job['height'] - (lineHeight*linenum) + lineHeight/5
+        blf.position(font_id, pos[0], pos[1] + ypos, 0)
+        blf.draw(font_id, line)
+        linenum += 1
+
+
+# --------------------------------------------------------------------
+# Get the shared rasterization offscreen, grown when a pass needs more
+# --------------------------------------------------------------------
+def get_raster_surface(size):
+    global _raster_surface
+    if _raster_surface is None or _raster_surface[0] < size:
+        if _raster_surface is not None:
+            _raster_surface[1].free()
+        _raster_surface = (size, gpu.types.GPUOffScreen(size, size))
+    return _raster_surface
+
+
+# --------------------------------------------------------------------
+# Store the rasterized pixels of an item
+# --------------------------------------------------------------------
+def set_text_pixels(textobj, pixels):
+    global _pixel_store_bytes
+    key = textobj.as_pointer()
+    drop_text_pixels(key)
+
+    pixels = np.asarray(pixels, dtype=np.uint8)
+    _pixel_store[key] = pixels
+    _pixel_store_bytes += pixels.nbytes
+
+    while _pixel_store_bytes > PIXEL_STORE_BUDGET and len(_pixel_store) > 1:
+        oldKey = next(iter(_pixel_store))
+        drop_text_pixels(oldKey)
+
+
+def get_text_pixels(key):
+    pixels = _pixel_store.get(key)
+    if pixels is not None:
+        _pixel_store.move_to_end(key)
+    return pixels
+
+
+def drop_text_pixels(key):
+    global _pixel_store_bytes
+    pixels = _pixel_store.pop(key, None)
+    if pixels is not None:
+        _pixel_store_bytes -= pixels.nbytes
+
+
+# --------------------------------------------------------------------
+# Check if the text of an item is available for drawing,
+# either in the atlas or in the pixel store
+# --------------------------------------------------------------------
+def has_text_image(textobj):
+    key = textobj.as_pointer()
+    return key in _regions or key in _pixel_store
+
+
+# --------------------------------------------------------------------
+# Get the atlas region holding the text of an item
+# The pixels are only uploaded when the item flagged a new texture
+# and its content differs from what is already in the atlas
+# returns the region dict or None when the item has no text yet
+# --------------------------------------------------------------------
+def get_text_region(textobj):
+    key = textobj.as_pointer()
+    region = _regions.get(key)
+
+    if region is None or textobj.texture_updated:
+        pixels = get_text_pixels(key)
+        if pixels is None:
+            # New pixels were evicted before reaching the atlas, rasterize again
+            textobj.text_updated = True
+            return region
+
+        width = textobj.textWidth
+        height = textobj.textHeight
+        if width == 0 or height == 0 or len(pixels) != width * height * 4:
+            return None
+        contentHash = hash((width, height, pixels.tobytes()))
+
+        if region is None or region['hash'] != contentHash:
+            if region is not None and region['w'] == width and region['h'] == height:
+                # Same size, overwrite in place
+                region['page'].upload(region['x'], region['y'], width, height, pixels)
+            else:
+                remove_region(key)
+                region = insert_region(key, width, height, pixels)
+                if region is None:
+                    return None
+            region['hash'] = contentHash
+
+        textobj.texture_updated = False
+
+    region['frame'] = _frame
+    return region
+
+
+def insert_region(key, width, height, pixels):
+    region = {
+        'key': key,
+        'w': width,
+        'h': height,
+        'hash': None,
+        'frame': _frame,
+        'evicted': False
+    }
+
+    if not place_region(region, pixels):
+        oversized = max(width, height) + ATLAS_PADDING * 2 > ATLAS_PAGE_SIZE
+        placed = False
+        if len(_pages) >= MAX_ATLAS_PAGES and not oversized:
+            # The repack may free pages, then the label gets a new one
+            evict_and_repack()
+            placed = place_region(region, pixels)
+        if not placed:
+            if len(_pages) >= MAX_ATLAS_PAGES and not oversized:
+                return None
+            size = max(ATLAS_PAGE_SIZE, width + ATLAS_PADDING * 2, height + ATLAS_PADDING * 2)
+            _pages.append(AtlasPage(size))
+            place_region(region, pixels, [_pages[-1]])
+
+    _regions[key] = region
+    return region
+
+
+def place_region(region, pixels, pages=None):
+    if pages is None:
+        pages = _pages
+    for page in pages:
+        pos = page.pack(region['w'], region['h'])
+        if pos is not None:
+            region['page'] = page
+            region['x'], region['y'] = pos
+            page.upload(pos[0], pos[1], region['w'], region['h'], pixels)
+            return True
+    return False
+
+
+def remove_region(key):
+    region = _regions.pop(key, None)
+    if region is not None:
+        region['evicted'] = True
+
+
+# --------------------------------------------------------------------
+# Drop the labels that were not drawn this or last frame
+# and pack the rest tightly, tallest first. Labels whose pixels
+# left the pixel store are dropped and rasterized again when needed.
+# Pages left without labels are freed, oversized pages included
+# --------------------------------------------------------------------
+def evict_and_repack():
+    for key, region in list(_regions.items()):
+        if region['frame'] < _frame - 1:
+            remove_region(key)
+
+    survivors = sorted(_regions.items(), key=lambda item: item[1]['h'], reverse=True)
+    for page in _pages:
+        page.clear()
+    for key, region in survivors:
+        pixels = get_text_pixels(key)
+        if pixels is None or not place_region(region, pixels):
+            remove_region(key)
+
+    for page in [page for page in _pages if len(page.shelves) == 0]:
+        page.free()
+        _pages.remove(page)
+
+
+# --------------------------------------------------------------------
+# Queue a text card for drawing
+# card: the four corners of the card
+# uvs: the normalized uv of each corner
+# --------------------------------------------------------------------
+def queue_text(card, uvs, region):
+    _text_queue.append((card, uvs, region))
+
+
+# --------------------------------------------------------------------
+# Draw every queued text card, one draw call per atlas page
+# The atlas uvs are resolved here since a repack during the
+# frame may have moved labels that were queued before it
+# --------------------------------------------------------------------
+def flush_text(shader):
+    global _frame
+
+    pageData = {}
+    for card, uvs, region in _text_queue:
+        if region['evicted']:
+            continue
+        page = region['page']
+        if page not in pageData:
+            pageData[page] = ([], [])
+        pos, texCoords = pageData[page]
+
+        # Split the card fan into two triangles
+        for idx in (0, 1, 2, 0, 2, 3):
+            u, v = uvs[idx]
+            pos.append(card[idx])
+            texCoords.append(((region['x'] + u * region['w']) / page.size,
+                              (region['y'] + v * region['h']) / page.size))
+
+    bgl.glEnable(bgl.GL_BLEND)
+    bgl.glEnable(bgl.GL_DEPTH_TEST)
+    bgl.glDepthFunc(bgl.GL_LEQUAL)
+    bgl.glDepthMask(False)
+    bgl.glActiveTexture(bgl.GL_TEXTURE0)
+    for page, (pos, texCoords) in pageData.items():
+        batch = batch_for_shader(shader, 'TRIS', {"pos": pos, "uv": texCoords})
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, page.texture)
+        shader.bind()
+        shader.uniform_float("image", 0)
+        batch.draw(shader)
+        gpu.shader.unbind()
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+    bgl.glDepthFunc(bgl.GL_LESS)
+    bgl.glDisable(bgl.GL_DEPTH_TEST)
+    bgl.glDepthMask(True)
+
+    _text_queue.clear()
+    _frame += 1
+
+
+def gen_texture():
+    texBuf = bgl.Buffer(bgl.GL_INT, 1)
+    bgl.glGenTextures(1, texBuf)
+    return texBuf[0]
+
+
+# --------------------------------------------------------------------
+# Release every atlas page and all stored pixels
+# --------------------------------------------------------------------
+def free_text_textures():
+    global _pixel_store_bytes
+    global _raster_surface
+    global _raster_start
+    for key in list(_regions.keys()):
+        remove_region(key)
+    for page in _pages:
+        page.free()
+    _pages.clear()
+    _text_queue.clear()
+    _pixel_store.clear()
+    _pixel_store_bytes = 0
+    _raster_queue.clear()
+    _raster_start = None
+    _text_drawn.clear()
+    if _raster_surface is not None:
+        _raster_surface[1].free()
+        _raster_surface = None
+
+
+# --------------------------------------------------------------------
+# Drop the text of every item after items were added or removed
+# Collection items move in memory when the collection changes, so the
+# pointers the text is keyed by may now belong to other items.
+# The pages keep their textures and are packed again from scratch
+# --------------------------------------------------------------------
+def invalidate_text():
+    global _pixel_store_bytes
+    global _raster_start
+    for key in list(_regions.keys()):
+        remove_region(key)
+    for page in _pages:
+        page.reset()
+    _pixel_store.clear()
+    _pixel_store_bytes = 0
+    _raster_queue.clear()
+    _raster_start = None
+    _text_drawn.clear()
+    free_text_layouts()
+
+
+# ------------------------------------------------------
+# Item pointers change on load and undo, text is
+# rasterized again lazily the next time it is drawn
+# ------------------------------------------------------
+@persistent
+def texture_load_handler(dummy):
+    free_text_textures()
+
+
+def register():
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if texture_load_handler not in handlers:
+            handlers.append(texture_load_handler)
+
+
+def unregister():
+    free_text_textures()
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if texture_load_handler in handlers:
+            handlers.remove(texture_load_handler)
@@ -163,6 +163,95 @@ class Line_Shader_3D ():
         }
     '''
 
+class Line_Adjacency_Shader_3D ():
+    # Thick lines with mitered joins, drawn from LINES_ADJ batches
+    # each segment is passed as (previous, start, end, next), an end
+    # without a neighbour repeats its own point and gets a square end
+    geometry_shader = '''
+        layout(lines_adjacency) in;
+        layout(triangle_strip, max_vertices = 4) out;
+
+        uniform mat4 ModelViewProjectionMatrix;
+        uniform vec2 Viewport;
+        uniform float thickness;
+
+        out vec2 mTexCoord;
+
+        float aspect = Viewport.x/Viewport.y;
+
+        // screen space with square pixels
+        vec2 toScreen(vec4 p) {
+            vec2 ssp = p.xy / p.w;
+            ssp.x *= aspect;
+            return ssp;
+        }
+
+        // offset of the joint at b so both segments keep their width
+        vec2 miter(vec2 a, vec2 b, vec2 c, vec2 normal) {
+            vec2 dirIn = b - a;
+            vec2 dirOut = c - b;
+            if (length(dirIn) < 0.000001 || length(dirOut) < 0.000001) {
+                return normal;
+            }
+
+            vec2 tangent = normalize(dirIn) + normalize(dirOut);
+            if (length(tangent) < 0.000001) {
+                return normal;
+            }
+            tangent = normalize(tangent);
+
+            // limit the miter length of sharp corners
+            vec2 miterDir = vec2(-tangent[1], tangent[0]);
+            return miterDir / max(dot(miterDir, normal), 0.25);
+        }
+
+        void main() {
+            vec4 p1 =  gl_in[1].gl_Position;
+            vec4 p2 =  gl_in[2].gl_Position;
+
+            vec2 s0 = toScreen(gl_in[0].gl_Position);
+            vec2 s1 = toScreen(p1);
+            vec2 s2 = toScreen(p2);
+            vec2 s3 = toScreen(gl_in[3].gl_Position);
+
+            float width = 0.00118 * thickness * aspect;
+
+            vec2 dir = normalize(s2 - s1);
+            vec2 normal = vec2(-dir[1], dir[0]);
+
+            // get offset factor from the miters and user input thicknes
+            vec2 offset1 = miter(s0, s1, s2, normal) * width;
+            vec2 offset2 = miter(s1, s2, s3, normal) * width;
+            offset1.x /= aspect;
+            offset2.x /= aspect;
+
+            vec2 ssp1 = vec2(p1.xy / p1.w);
+            vec2 ssp2 = vec2(p2.xy / p2.w);
+
+            vec4 coords[4];
+            vec2 texCoords[4];
+
+            coords[0] = vec4((ssp1 + offset1)*p1.w,p1.z,p1.w);
+            texCoords[0] = vec2(0,1);
+
+            coords[1] = vec4((ssp1 - offset1)*p1.w,p1.z,p1.w);
+            texCoords[1] = vec2(0,0);
+
+            coords[2] = vec4((ssp2 + offset2)*p2.w,p2.z,p2.w);
+            texCoords[2] = vec2(0,1);
+
+            coords[3] = vec4((ssp2 - offset2)*p2.w,p2.z,p2.w);
+            texCoords[3] = vec2(0,0);
+
+            for (int i = 0; i < 4; ++i) {
+                mTexCoord = texCoords[i];
+                gl_Position = coords[i];
+                EmitVertex();
+            }
+            EndPrimitive();
+        }
+    '''
+
 class Dashed_Shader_3D ():
 
     vertex_shader = '''
@@ -284,6 +373,378 @@ class Dashed_Shader_3D ():
         }
     '''
 
+class Hidden_Line_Shader_3D ():
+    # Visible and hidden lines in one pass, drawn from LINES_ADJ
+    # batches with the depth test off. Each fragment compares its
+    # depth with a copy of the scene depth to pick its style
+    vertex_shader = '''
+        uniform mat4 ModelViewProjectionMatrix;
+        uniform float offset;
+
+        in vec3 pos;
+        in float arcLength;
+
+        out float v_ArcLength;
+
+        vec4 project = ModelViewProjectionMatrix * vec4(pos, 1.0);
+        vec4 vecOffset = vec4(0.0,0.0,offset,0.0);
+
+        void main()
+        {
+            v_ArcLength = arcLength;
+            gl_Position = project + vecOffset;
+        }
+    '''
+
+    geometry_shader = '''
+        layout(lines_adjacency) in;
+        layout(triangle_strip, max_vertices = 4) out;
+        in float v_ArcLength[];
+        out float g_ArcLength;
+
+        uniform mat4 ModelViewProjectionMatrix;
+        uniform vec2 Viewport;
+        uniform float thickness;
+        uniform float hiddenThickness;
+        uniform bool screenSpaceDash;
+
+        out vec2 mTexCoord;
+
+        float aspect = Viewport.x/Viewport.y;
+
+        // screen space with square pixels
+        vec2 toScreen(vec4 p) {
+            vec2 ssp = p.xy / p.w;
+            ssp.x *= aspect;
+            return ssp;
+        }
+
+        // offset of the joint at b so both segments keep their width
+        vec2 miter(vec2 a, vec2 b, vec2 c, vec2 normal) {
+            vec2 dirIn = b - a;
+            vec2 dirOut = c - b;
+            if (length(dirIn) < 0.000001 || length(dirOut) < 0.000001) {
+                return normal;
+            }
+
+            vec2 tangent = normalize(dirIn) + normalize(dirOut);
+            if (length(tangent) < 0.000001) {
+                return normal;
+            }
+            tangent = normalize(tangent);
+
+            // limit the miter length of sharp corners
+            vec2 miterDir = vec2(-tangent[1], tangent[0]);
+            return miterDir / max(dot(miterDir, normal), 0.25);
+        }
+
+        void main() {
+            vec4 p1 =  gl_in[1].gl_Position;
+            vec4 p2 =  gl_in[2].gl_Position;
+
+            vec2 s0 = toScreen(gl_in[0].gl_Position);
+            vec2 s1 = toScreen(p1);
+            vec2 s2 = toScreen(p2);
+            vec2 s3 = toScreen(gl_in[3].gl_Position);
+
+            // wide enough for both styles, the fragment shader trims it
+            float width = 0.00118 * max(thickness, hiddenThickness) * aspect;
+
+            vec2 dir = normalize(s2 - s1);
+            vec2 normal = vec2(-dir[1], dir[0]);
+
+            vec2 offset1 = miter(s0, s1, s2, normal) * width;
+            vec2 offset2 = miter(s1, s2, s3, normal) * width;
+            offset1.x /= aspect;
+            offset2.x /= aspect;
+
+            vec2 ssp1 = vec2(p1.xy / p1.w);
+            vec2 ssp2 = vec2(p2.xy / p2.w);
+
+            vec4 coords[4];
+            vec2 texCoords[4];
+
+            coords[0] = vec4((ssp1 + offset1)*p1.w,p1.z,p1.w);
+            texCoords[0] = vec2(0,1);
+
+            coords[1] = vec4((ssp1 - offset1)*p1.w,p1.z,p1.w);
+            texCoords[1] = vec2(0,0);
+
+            coords[2] = vec4((ssp2 + offset2)*p2.w,p2.z,p2.w);
+            texCoords[2] = vec2(0,1);
+
+            coords[3] = vec4((ssp2 - offset2)*p2.w,p2.z,p2.w);
+            texCoords[3] = vec2(0,0);
+
+            float arcLengths[4];
+            arcLengths[0] = v_ArcLength[1];
+            arcLengths[1] = v_ArcLength[1];
+
+            if (screenSpaceDash){
+                arcLengths[2] = length(ssp2-ssp1) * 20;
+                arcLengths[3] = length(ssp2-ssp1) * 20;
+            }
+            else{
+                arcLengths[2] =  v_ArcLength[2];
+                arcLengths[3] =  v_ArcLength[2];
+            }
+
+            for (int i = 0; i < 4; ++i) {
+                mTexCoord = texCoords[i];
+                gl_Position = coords[i];
+                g_ArcLength = arcLengths[i];
+                EmitVertex();
+            }
+            EndPrimitive();
+        }
+    '''
+
+    fragment_shader = '''
+        in vec2 mTexCoord;
+        in float g_ArcLength;
+
+        uniform sampler2D depthImage;
+        uniform vec2 depthOrigin;
+        uniform vec4 finalColor;
+        uniform vec4 hiddenColor;
+        uniform float thickness;
+        uniform float hiddenThickness;
+        uniform float u_Scale;
+        uniform float dashVisible;
+
+        out vec4 fragColor;
+
+        void main()
+        {
+            float sceneDepth = texelFetch(depthImage, ivec2(gl_FragCoord.xy - depthOrigin), 0).r;
+            bool hidden = gl_FragCoord.z > sceneDepth;
+
+            vec4 aaColor = finalColor;
+            float width = thickness;
+            if (hidden) {
+                aaColor = hiddenColor;
+                width = hiddenThickness;
+            }
+
+            if ((hidden || dashVisible > 0.5) && step(sin(g_ArcLength * u_Scale), 0.5) == 1) discard;
+
+            vec2 center = vec2(0,0.5);
+            float dist = length(mTexCoord - center) * max(thickness, hiddenThickness) / width;
+            float distFromEdge = 1-(dist*2);
+
+            float delta = fwidth(distFromEdge);
+            float threshold = 2*delta;
+            float aa = clamp((distFromEdge/threshold)+0.5,0,1);
+            aa = aa -clamp(0.5*fwidth(aa),0,1);
+
+            if (aa <= 0) discard;
+
+            float alpha = aaColor[3];
+            aaColor[3] = mix(0,1.0,aa);
+            if (alpha<0.75){
+                aaColor[3] *=0.25;
+            }
+
+            fragColor = aaColor;
+        }
+    '''
+
+class End_Cap_Shader_3D ():
+    # Endcaps built on the GPU from one point per cap
+    # capParams: cap type, size, arrow angle, side of the dimension
+    # cap types: 1 line arrow, 2 triangle arrow, 3 architectural dash, 4 cone
+    vertex_shader = '''
+        in vec3 pos;
+        in vec3 capDir;
+        in vec3 capNormal;
+        in vec3 capUp;
+        in vec4 capParams;
+
+        out vec3 v_Dir;
+        out vec3 v_Normal;
+        out vec3 v_Up;
+        out vec4 v_Params;
+
+        void main()
+        {
+            v_Dir = capDir;
+            v_Normal = capNormal;
+            v_Up = capUp;
+            v_Params = capParams;
+            gl_Position = vec4(pos, 1.0);
+        }
+    '''
+
+    geometry_shader = '''
+        layout(points) in;
+        layout(triangle_strip, max_vertices = 36) out;
+
+        in vec3 v_Dir[];
+        in vec3 v_Normal[];
+        in vec3 v_Up[];
+        in vec4 v_Params[];
+
+        uniform mat4 ModelViewProjectionMatrix;
+        uniform vec2 Viewport;
+        uniform float thickness;
+
+        out vec2 mTexCoord;
+        flat out float mFilled;
+
+        float aspect = Viewport.x/Viewport.y;
+
+        vec3 rotate(vec3 v, vec3 axis, float angle) {
+            if (length(axis) < 0.000001) {
+                return v;
+            }
+            axis = normalize(axis);
+            return v * cos(angle) + cross(axis, v) * sin(angle) + axis * dot(axis, v) * (1 - cos(angle));
+        }
+
+        void emitLine(vec3 a, vec3 b) {
+            vec4 p1 = ModelViewProjectionMatrix * vec4(a, 1.0);
+            vec4 p2 = ModelViewProjectionMatrix * vec4(b, 1.0);
+
+            vec2 ssp1 = vec2(p1.xy / p1.w);
+            vec2 ssp2 = vec2(p2.xy / p2.w);
+
+            float width = 0.00118 * thickness * aspect;
+
+            vec2 dir = normalize(ssp2 - ssp1);
+            vec2 normal = vec2(-dir[1], dir[0]);
+            vec2 offset = vec2(normal * width);
+            offset.x /= aspect;
+
+            mFilled = 0.0;
+            mTexCoord = vec2(0,1);
+            gl_Position = vec4((ssp1 + offset)*p1.w,p1.z,p1.w);
+            EmitVertex();
+            mTexCoord = vec2(0,0);
+            gl_Position = vec4((ssp1 - offset)*p1.w,p1.z,p1.w);
+            EmitVertex();
+            mTexCoord = vec2(0,1);
+            gl_Position = vec4((ssp2 + offset)*p2.w,p2.z,p2.w);
+            EmitVertex();
+            mTexCoord = vec2(0,0);
+            gl_Position = vec4((ssp2 - offset)*p2.w,p2.z,p2.w);
+            EmitVertex();
+            EndPrimitive();
+        }
+
+        void emitTri(vec3 a, vec3 b, vec3 c) {
+            // filled, drawn with finalColor as is
+            mFilled = 1.0;
+            mTexCoord = vec2(0,0.5);
+            gl_Position = ModelViewProjectionMatrix * vec4(a, 1.0);
+            EmitVertex();
+            gl_Position = ModelViewProjectionMatrix * vec4(b, 1.0);
+            EmitVertex();
+            gl_Position = ModelViewProjectionMatrix * vec4(c, 1.0);
+            EmitVertex();
+            EndPrimitive();
+        }
+
+        void main() {
+            vec3 pos = gl_in[0].gl_Position.xyz;
+            vec3 dir = v_Dir[0];
+            vec3 norm = v_Normal[0];
+            int capType = int(v_Params[0][0] + 0.5);
+            float capSize = v_Params[0][1];
+            float arrowAngle = v_Params[0][2];
+
+            // Line and Triangle Geometry
+            if (capType == 1 || capType == 2) {
+                vec3 line = dir * capSize / 100;
+                vec3 p1 = pos - rotate(line, norm, arrowAngle);
+                vec3 p3 = pos - rotate(line, norm, -arrowAngle);
+                if (capType == 2) {
+                    emitTri(p1, pos, p3);
+                }
+                else {
+                    emitLine(p1, pos);
+                    emitLine(p3, pos);
+                }
+            }
+
+            // Dashed Endcap Geometry
+            else if (capType == 3) {
+                float rotangle = radians(-90);
+                vec3 up = v_Up[0];
+
+                // Overextension
+                emitLine(pos, pos + rotate(up / 20, norm, rotangle));
+
+                // Square
+                vec3 x = normalize(dir) * capSize / 20;
+                vec3 y = normalize(up) * capSize / 20;
+                float a = 0.055;
+                float b = 0.085;
+
+                vec3 square[4];
+                square[0] = (a*x) + (b*y);
+                square[1] = (b*x) + (a*y);
+                square[2] = (-a*x) + (-b*y);
+                square[3] = (-b*x) + (-a*y);
+                for (int i = 0; i < 4; ++i) {
+                    if (v_Params[0][3] < 1) {
+                        square[i] = rotate(square[i], norm, rotangle);
+                    }
+                    square[i] += pos;
+                }
+
+                emitTri(square[0], square[1], square[2]);
+                emitTri(square[0], square[2], square[3]);
+            }
+
+            // Cone, pointing along dir
+            else if (capType == 4) {
+                vec3 line = -normalize(dir) * 0.01 * capSize;
+                vec3 perp = abs(dir.x) < abs(dir.z) ? cross(dir, vec3(1, 0, 0)) : cross(dir, vec3(0, 0, 1));
+                line = rotate(line, perp, arrowAngle - radians(5));
+                for (int i = 0; i < 12; ++i) {
+                    vec3 a = rotate(line, dir, radians(30) * i);
+                    vec3 b = rotate(line, dir, radians(30) * (i + 1));
+                    emitTri(pos + a, pos, pos + b);
+                }
+            }
+        }
+    '''
+
+    # Line_Shader_3D fragment for the line parts, filled
+    # triangles and cones keep the plain finalColor
+    fragment_shader = '''
+        in vec2 mTexCoord;
+        flat in float mFilled;
+        uniform vec4 finalColor;
+        out vec4 fragColor;
+
+        void main()
+        {
+            if (mFilled > 0.5) {
+                fragColor = finalColor;
+                return;
+            }
+
+            vec4 aaColor = finalColor;
+
+            vec2 center = vec2(0,0.5);
+            float dist = length(mTexCoord - center);
+            float distFromEdge = 1-(dist*2);
+
+            float delta = fwidth(distFromEdge);
+            float threshold = 2*delta;
+            float aa = clamp((distFromEdge/threshold)+0.5,0,1);
+            aa = aa -clamp(0.5*fwidth(aa),0,1);
+
+            aaColor[3] = mix(0,1.0,aa);
+            if (finalColor[3]<0.75){
+                aaColor[3] *=0.25;
+            }
+
+            fragColor = aaColor;
+        }
+    '''
+
 class Point_Shader_3D ():
 
    
@@ -410,6 +871,26 @@ class Text_Shader():
         }
     '''
 
+class SDF_Text_Shader():
+    vertex_shader = Text_Shader.vertex_shader
+
+    fragment_shader = '''
+        uniform sampler2D image;
+        uniform vec4 finalColor;
+
+        in vec2 uvInterp;
+        out vec4 fragColor;
+
+        void main()
+        {
+            // Distance to the glyph outline is stored in red, 0.5 on the outline
+            float dist = texture(image, uvInterp).r;
+            float width = fwidth(dist) * 0.75;
+            float alpha = smoothstep(0.5 - width, 0.5 + width, dist);
+            fragColor = vec4(finalColor.rgb, finalColor.a * alpha);
+        }
+    '''
+
 class DepthOnlyFrag():
     fragment_shader = ''' 
         out vec4 fragColor;